@@ -0,0 +1,56 @@
+"""Benchmark string interpolation on configurations with many interpolated values.
+
+Run with ``python benchmarks/interpolation.py [number of keys]``.
+"""
+
+# ruff: noqa: T201
+
+import sys
+import timeit
+from typing import Any, Dict
+
+from config import InterpolateEnumType, config_from_dict
+from config.helpers import parse_template
+
+
+def build(n: int) -> Dict[str, Any]:
+    """Return a configuration with `n` interpolated values."""
+    d: Dict[str, Any] = {f"base.v{i}": f"value{i}" for i in range(100)}
+    d.update(
+        {
+            f"templates.t{i}": "{base.v%d}/{base.v%d}:{port:>5}"
+            % (i % 100, (i * 7) % 100)
+            for i in range(n)
+        },
+    )
+    d["port"] = 8080
+    return d
+
+
+def run(n: int, method: InterpolateEnumType) -> None:
+    """Time the interpolation of every value, with and without parsed templates."""
+    d = build(n)
+    keys = [k for k in d if k.startswith("templates.")]
+
+    def read_all() -> None:
+        # a new instance each time, so that only the template cache is reused
+        cfg = config_from_dict(d, interpolate=True, interpolate_type=method)
+        for k in keys:
+            cfg[k]
+
+    def cold() -> None:
+        parse_template.cache_clear()
+        read_all()
+
+    cold_time = min(timeit.repeat(cold, number=1, repeat=5))
+    warm_time = min(timeit.repeat(read_all, number=1, repeat=5))
+    print(
+        f"{method.name:<18} {n:>7} keys: "
+        f"cold {cold_time * 1e3:8.1f} ms, warm {warm_time * 1e3:8.1f} ms",
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    for method in InterpolateEnumType:
+        run(n, method)
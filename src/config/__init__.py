@@ -1,12 +1,31 @@
 """python-configuration module."""
 
+import contextlib
+import hashlib
 import json
 import os
 import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from copy import copy
+from functools import partial
 from importlib.abc import InspectLoader
 from pathlib import Path
 from types import ModuleType
-from typing import Any, Dict, Iterable, List, Mapping, Optional, TextIO, Union, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    TextIO,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
 try:
     import yaml
@@ -24,9 +43,23 @@ else:  # pragma: no cover
 
 
 from ._version import __version__, __version_tuple__  # noqa: F401
-from .configuration import Configuration
+from .configuration import Configuration, FrozenConfiguration  # noqa: F401
 from .configuration_set import ConfigurationSet
-from .helpers import InterpolateEnumType, InterpolateType, parse_env_line
+from .files import (
+    RACY_NANOSECONDS,
+    dump_flat,
+    file_signature,
+    load_flat,
+    read_cache_entry,
+    write_cache_entry,
+)
+from .helpers import (
+    InterpolateEnumType,
+    InterpolateType,
+    LoadError,
+    parse_env_line,
+)
+from .watch import Watcher  # noqa: F401
 
 
 def config(
@@ -39,6 +72,9 @@ def config(
     ignore_missing_paths: bool = False,
     interpolate: InterpolateType = False,
     interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
+    parallel: Union[bool, str] = False,
+    max_workers: Optional[int] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
 ) -> ConfigurationSet:
     """Create a [ConfigurationSet][config.configuration_set.ConfigurationSet] instance from an iterable of configs.
 
@@ -51,14 +87,24 @@ def config(
        ignore_missing_paths: whether to ignore failures from missing files/folders.
        separator: separator for Python modules and environment variables.
        interpolate: whether to apply string interpolation when looking for items
+       parallel: whether to load the sources concurrently on a thread pool. With
+           "processes", the files are also parsed on a process pool, which is
+           shut down once the configurations are created, so that they are
+           parsed in the current process when reloaded.
+       max_workers: maximum number of threads and processes when loading in parallel
+       cache_dir: directory to cache the parsed contents of the files in
 
     Note that the `separator` parameter  impacts Python modules and
     environment variables at the same time. To pass different separators to Python
     modules and environments, use the longer version
     ``('python', 'path-to-module', prefix, separator)``
     and ``('env', prefix, separator)`` .
+
+    With `parallel`, the order of the configurations is preserved and, if some
+    sources fail to load, a `LoadError` is raised with the error of each of them.
     """  # noqa: E501
-    instances = []
+    # each source, or the function building it, in order
+    sources: List[Union[Configuration, Callable[[], Configuration]]] = []
     default_args: List[str] = [prefix]
     if separator is not None:
         default_args.append(separator)
@@ -69,12 +115,19 @@ def config(
         "interpolate_type": InterpolateEnumType.STANDARD,
     }
 
+    # parsing large files is CPU-bound, so it can be moved to other processes
+    process_pool: Optional[Executor] = None
+    if isinstance(parallel, str) and parallel != "processes":
+        raise ValueError(f'Unknown parallel mode "{parallel}"')
+    if parallel == "processes":
+        process_pool = ProcessPoolExecutor(max_workers=max_workers)
+
     for config_ in configs:
         if isinstance(config_, Mapping):
-            instances.append(config_from_dict(config_, **default_kwargs))
+            sources.append(partial(config_from_dict, config_, **default_kwargs))
             continue
         elif isinstance(config_, Configuration):
-            instances.append(config_)
+            sources.append(config_)
             continue
         elif isinstance(config_, str):
             if config_.endswith(".py"):
@@ -105,11 +158,12 @@ def config(
             )
         type_ = config_[0]
         if type_ == "dict":
-            instances.append(config_from_dict(*config_[1:], **default_kwargs))
+            sources.append(partial(config_from_dict, *config_[1:], **default_kwargs))
         elif type_ in ("env", "environment"):
             params = list(config_[1:]) + default_args[(len(config_) - 1) :]
-            instances.append(
-                config_from_env(
+            sources.append(
+                partial(
+                    config_from_env,
                     *params,
                     **default_kwargs,
                     strip_prefix=strip_prefix,
@@ -119,8 +173,9 @@ def config(
             if len(config_) < 2:
                 raise ValueError("No path specified for python module")
             params = list(config_[1:]) + default_args[(len(config_) - 2) :]
-            instances.append(
-                config_from_python(
+            sources.append(
+                partial(
+                    config_from_python,
                     *params,
                     **default_kwargs,
                     ignore_missing_paths=ignore_missing_paths,
@@ -128,51 +183,67 @@ def config(
                 ),
             )
         elif type_ == "json":
-            instances.append(
-                config_from_json(
+            sources.append(
+                partial(
+                    config_from_json,
                     *config_[1:],
                     **default_kwargs,
                     ignore_missing_paths=ignore_missing_paths,
+                    process_pool=process_pool,
+                    cache_dir=cache_dir,
                 ),
             )
         elif yaml and type_ == "yaml":
-            instances.append(
-                config_from_yaml(
+            sources.append(
+                partial(
+                    config_from_yaml,
                     *config_[1:],
                     **default_kwargs,
                     ignore_missing_paths=ignore_missing_paths,
+                    process_pool=process_pool,
+                    cache_dir=cache_dir,
                 ),
             )
         elif toml and type_ == "toml":
-            instances.append(
-                config_from_toml(
+            sources.append(
+                partial(
+                    config_from_toml,
                     *config_[1:],
                     **default_kwargs,
                     ignore_missing_paths=ignore_missing_paths,
+                    process_pool=process_pool,
+                    cache_dir=cache_dir,
                     strip_prefix=strip_prefix,
                 ),
             )
         elif type_ == "ini":
-            instances.append(
-                config_from_ini(
+            sources.append(
+                partial(
+                    config_from_ini,
                     *config_[1:],
                     **default_kwargs,
                     ignore_missing_paths=ignore_missing_paths,
+                    process_pool=process_pool,
+                    cache_dir=cache_dir,
                     strip_prefix=strip_prefix,
                 ),
             )
         elif type_ == "dotenv":
-            instances.append(
-                config_from_dotenv(
+            sources.append(
+                partial(
+                    config_from_dotenv,
                     *config_[1:],
                     **default_kwargs,
                     ignore_missing_paths=ignore_missing_paths,
+                    process_pool=process_pool,
+                    cache_dir=cache_dir,
                     strip_prefix=strip_prefix,
                 ),
             )
         elif type_ == "path":
-            instances.append(
-                config_from_path(
+            sources.append(
+                partial(
+                    config_from_path,
                     *config_[1:],
                     **default_kwargs,
                     ignore_missing_paths=ignore_missing_paths,
@@ -181,6 +252,12 @@ def config(
         else:
             raise ValueError(f'Unknown configuration type "{type_}"')
 
+    try:
+        instances = _build_sources(sources, bool(parallel), max_workers)
+    finally:
+        if process_pool is not None:
+            process_pool.shutdown()
+
     return ConfigurationSet(
         *instances,
         interpolate=interpolate,
@@ -188,6 +265,46 @@ def config(
     )
 
 
+def _build_sources(
+    sources: List[Union[Configuration, Callable[[], Configuration]]],
+    parallel: bool,
+    max_workers: Optional[int],
+) -> List[Configuration]:
+    """Build the configurations of `config`, in order.
+
+    Params:
+        sources: configurations, or functions building them.
+        parallel: whether to call the functions on a thread pool.
+        max_workers: maximum number of threads when building in parallel.
+    """
+    if not parallel:
+        return [
+            source if isinstance(source, Configuration) else source()
+            for source in sources
+        ]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(source)
+            for source in sources
+            if not isinstance(source, Configuration)
+        ]
+    errors: Dict[int, Exception] = {}
+    pending = iter(futures)
+    instances = []
+    for i, source in enumerate(sources):
+        if isinstance(source, Configuration):
+            instances.append(source)
+            continue
+        try:
+            instances.append(next(pending).result())
+        except Exception as err:
+            errors[i] = err
+    if errors:
+        raise LoadError(errors)
+    return instances
+
+
 class EnvConfiguration(Configuration):
     """Configuration from Environment variables."""
 
@@ -219,8 +336,8 @@ class EnvConfiguration(Configuration):
         )
         self.reload()
 
-    def reload(self) -> None:
-        """Reload the environment values."""
+    def _load(self) -> Tuple[Dict[str, Any], Any]:
+        """Read the environment values."""
         result = {}
         for key, value in os.environ.items():
             if not key.startswith(self._prefix + self._separator):
@@ -231,12 +348,7 @@ class EnvConfiguration(Configuration):
                 ] = value
             else:
                 result[key.replace(self._separator, ".").strip(".")] = value
-        super().__init__(
-            result,
-            lowercase_keys=self._lowercase,
-            interpolate=self._interpolate,
-            interpolate_type=self._interpolate_type,
-        )
+        return self._flatten_dict(result), None
 
 
 def config_from_env(
@@ -300,8 +412,8 @@ class PathConfiguration(Configuration):
         self._ignore_missing_paths = ignore_missing_paths
         self.reload()
 
-    def reload(self) -> None:
-        """Reload the path."""
+    def _load(self) -> Tuple[Dict[str, Any], Any]:
+        """Read the path."""
         try:
             path = os.path.normpath(self._path)
             if not os.path.exists(path) or not os.path.isdir(path):
@@ -331,12 +443,7 @@ class PathConfiguration(Configuration):
                 result = {}
             else:
                 raise
-        super().__init__(
-            result,
-            lowercase_keys=self._lowercase,
-            interpolate=self._interpolate,
-            interpolate_type=self._interpolate_type,
-        )
+        return self._flatten_dict(result), None
 
 
 def config_from_path(
@@ -369,9 +476,31 @@ def config_from_path(
     )
 
 
+def _parse_file(
+    cls: Type["FileConfiguration"],
+    settings: Dict[str, Any],
+    data: Union[str, Path],
+    read_from_file: bool,
+) -> bytes:
+    """Parse a file configuration, e.g. in another process, serializing the result.
+
+    Params:
+        cls: class of the configuration.
+        settings: attributes of the configuration used when parsing.
+        data: path to the file, or its contents.
+        read_from_file: whether `data` is a path.
+    """
+    parser = cls.__new__(cls)
+    parser.__dict__.update(settings)
+    return dump_flat(parser._parse(data, read_from_file))
+
+
 class FileConfiguration(Configuration):
     """Configuration from a file input."""
 
+    # attributes `_parse` depends on, sent along when parsing in another process
+    _parse_settings: Tuple[str, ...] = ("_lowercase",)
+
     def __init__(
         self,
         data: Union[str, Path, TextIO],
@@ -381,6 +510,8 @@ class FileConfiguration(Configuration):
         interpolate: InterpolateType = False,
         interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
         ignore_missing_paths: bool = False,
+        process_pool: Optional[Executor] = None,
+        cache_dir: Optional[Union[str, Path]] = None,
     ):
         """Class Constructor.
 
@@ -388,6 +519,11 @@ class FileConfiguration(Configuration):
         read_from_file: whether to read from a file path or to interpret
             the `data` as the contents of the file.
         lowercase_keys: whether to convert every key to lower case.
+        process_pool: executor to parse the data in when creating the instance,
+            e.g. a `ProcessPoolExecutor` for large files.
+        cache_dir: directory to keep the parsed contents of the file in, and to
+            read them from while the file does not change. It should only be
+            writable by trusted users, as the cached contents are unpickled.
         """
         super().__init__(
             {},
@@ -399,42 +535,168 @@ class FileConfiguration(Configuration):
             data if read_from_file and isinstance(data, (str, Path)) else None
         )
         self._ignore_missing_paths = ignore_missing_paths
-        self._reload_with_check(data, read_from_file)
+        self._cache_dir = cache_dir
+        self._reload_with_check(data, read_from_file, process_pool)
 
     def _reload_with_check(
         self,
         data: Union[str, Path, TextIO],
         read_from_file: bool = False,
-    ) -> None:  # pragma: no cover
+        process_pool: Optional[Executor] = None,
+    ) -> bool:  # pragma: no cover
+        if type(self)._parse is FileConfiguration._parse or not isinstance(
+            data,
+            (str, Path),
+        ):
+            # subclasses only overriding `_reload` can only be loaded by it
+            generation = self._generation
+            try:
+                self._reload(data, read_from_file)
+            except FileNotFoundError:
+                if not self._ignore_missing_paths:
+                    raise
+                self._replace_config({})
+            return self._generation != generation
+        return self._replace_config(*self._read(data, read_from_file, process_pool))
+
+    def _read(
+        self,
+        data: Union[str, Path],
+        read_from_file: bool = False,
+        process_pool: Optional[Executor] = None,
+    ) -> Tuple[Dict[str, Any], Any]:
+        """Parse the data without publishing it.
+
+        Returns:
+            the flattened dictionary and the signature of the file it was read
+            from, if any.
+        """
         try:
-            self._reload(data, read_from_file)
+            signature = file_signature(data) if read_from_file else None
+            if self._cache_dir is not None and read_from_file:
+                config_ = self._parse_cached(data, process_pool)
+            elif process_pool is not None:
+                config_ = load_flat(self._parse_in(process_pool, data, read_from_file))
+            else:
+                config_ = self._parse(data, read_from_file)
         except FileNotFoundError:
             if not self._ignore_missing_paths:
                 raise
-            self._config = self._flatten_dict({})
+            return {}, None
+        return config_, signature
 
     def _reload(
         self,
         data: Union[str, Path, TextIO],
         read_from_file: bool = False,
-    ) -> None:  # pragma: no cover
+    ) -> None:
+        self._replace_config(self._parse(data, read_from_file))
+
+    def _parse_in(
+        self,
+        executor: Executor,
+        data: Union[str, Path],
+        read_from_file: bool = False,
+    ) -> bytes:
+        """Parse the data in `executor`, returning the serialized result.
+
+        Only the settings listed in `_parse_settings` are sent along with the
+        data, and the flattened dictionary comes back serialized.
+        """
+        cls = type(self)
+        settings = {k: getattr(self, k) for k in self._parse_settings}
+        future = executor.submit(_parse_file, cls, settings, data, read_from_file)
+        return future.result()
+
+    def _parse_cached(
+        self,
+        path: Union[str, Path],
+        process_pool: Optional[Executor] = None,
+    ) -> Dict[str, Any]:
+        """Return the flattened dictionary of a file, parsing it only if it changed.
+
+        The cache entries are named after the class, the settings in
+        `_parse_settings` and the absolute path of the file, and hold the size,
+        modification time and hash of the file the contents were parsed from.
+        A file whose size or modification time changed is only parsed again if
+        its hash changed too. As with `file_signature`, files modified less
+        than a second before they are read may change again without their
+        modification time changing, and are always compared by hash.
+        """
+        cls = type(self)
+        path = os.path.abspath(path)
+        settings = {k: getattr(self, k) for k in self._parse_settings}
+        key = repr((cls.__module__, cls.__qualname__, settings, path))
+        entry = os.path.join(
+            cast(Union[str, Path], self._cache_dir),
+            hashlib.sha256(key.encode()).hexdigest(),
+        )
+        stat = os.stat(path)
+        racy = time.time_ns() - stat.st_mtime_ns < RACY_NANOSECONDS
+        # racy entries are never matched by modification time, only by hash
+        mtime = -1 if racy else stat.st_mtime_ns
+        cached = read_cache_entry(entry)
+        if not racy and cached is not None and cached[:2] == (stat.st_size, mtime):
+            with contextlib.suppress(Exception):
+                return load_flat(cached[3])
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).digest()
+        header = (stat.st_size, mtime, digest)
+        if cached is not None and cached[2] == digest:
+            with contextlib.suppress(Exception):
+                result = load_flat(cached[3])
+                write_cache_entry(entry, header, cached[3])
+                return result
+        if process_pool is not None:
+            body = self._parse_in(process_pool, path, True)
+            result = load_flat(body)
+        else:
+            result = self._parse(path, True)
+            body = dump_flat(result)
+        write_cache_entry(entry, header, body)
+        return result
+
+    def _parse(
+        self,
+        data: Union[str, Path, TextIO],
+        read_from_file: bool = False,
+    ) -> Dict[str, Any]:  # pragma: no cover
+        """Return the flattened dictionary read from the data."""
         raise NotImplementedError()
 
-    def reload(self) -> None:
-        """Reload the configuration."""
-        if self._filename:  # pragma: no branch
-            self._reload_with_check(self._filename, True)
+    def _load(self) -> Optional[Tuple[Dict[str, Any], Any]]:
+        """Read the file again, unless it did not change.
+
+        The file is considered unchanged while its inode, size and modification
+        time are the same as when it was last read. With a `cache_dir`, a file
+        whose contents are the same is not parsed again either.
+        """
+        if not self._filename:  # pragma: no cover
+            return None
+        if type(self)._parse is FileConfiguration._parse:
+            # subclasses only overriding `_reload` publish what they read, so
+            # they read into a copy
+            staged = copy(self)
+            staged._reload_with_check(self._filename, True)
+            return staged._config, None
+        # inode, size and modification time of the file the contents were read from
+        signature = cast(Any, self._contents).source
+        if signature is not None:
+            with contextlib.suppress(OSError):
+                if file_signature(self._filename) == signature:
+                    return None
+        return self._read(self._filename, True)
 
 
 class JSONConfiguration(FileConfiguration):
     """Configuration from a JSON input."""
 
-    def _reload(
+    def _parse(
         self,
         data: Union[str, Path, TextIO],
         read_from_file: bool = False,
-    ) -> None:
-        """Reload the JSON data."""
+    ) -> Dict[str, Any]:
+        """Parse the JSON data."""
         if read_from_file:
             if isinstance(data, (str, Path)):
                 with open(data, "rt") as f:
@@ -443,7 +705,7 @@ class JSONConfiguration(FileConfiguration):
                 result = json.load(data)
         else:
             result = json.loads(cast(str, data))
-        self._config = self._flatten_dict(result)
+        return self._flatten_dict(result)
 
 
 def config_from_json(
@@ -454,6 +716,8 @@ def config_from_json(
     interpolate: InterpolateType = False,
     interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
     ignore_missing_paths: bool = False,
+    process_pool: Optional[Executor] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
 ) -> Configuration:
     """Create a [Configuration][config.configuration.Configuration] instance from a JSON file.
 
@@ -464,6 +728,8 @@ def config_from_json(
         lowercase_keys: whether to convert every key to lower case.
         interpolate: whether to apply string interpolation when looking for items.
         ignore_missing_paths: if true it will not throw on missing paths.
+        process_pool: executor to parse the data in, e.g. a `ProcessPoolExecutor`.
+        cache_dir: directory to cache the parsed contents of the file in.
 
     Returns:
         a [Configuration][config.configuration.Configuration] instance.
@@ -475,12 +741,16 @@ def config_from_json(
         interpolate=interpolate,
         interpolate_type=interpolate_type,
         ignore_missing_paths=ignore_missing_paths,
+        process_pool=process_pool,
+        cache_dir=cache_dir,
     )
 
 
 class INIConfiguration(FileConfiguration):
     """Configuration from an INI file input."""
 
+    _parse_settings = ("_lowercase", "_section_prefix", "_strip_prefix")
+
     def __init__(
         self,
         data: Union[str, Path, TextIO],
@@ -492,6 +762,8 @@ class INIConfiguration(FileConfiguration):
         interpolate: InterpolateType = False,
         interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
         ignore_missing_paths: bool = False,
+        process_pool: Optional[Executor] = None,
+        cache_dir: Optional[Union[str, Path]] = None,
     ):
         """Class Constructor."""
         self._section_prefix = section_prefix
@@ -503,14 +775,16 @@ class INIConfiguration(FileConfiguration):
             interpolate=interpolate,
             interpolate_type=interpolate_type,
             ignore_missing_paths=ignore_missing_paths,
+            process_pool=process_pool,
+            cache_dir=cache_dir,
         )
 
-    def _reload(
+    def _parse(
         self,
         data: Union[str, Path, TextIO],
         read_from_file: bool = False,
-    ) -> None:
-        """Reload the INI data."""
+    ) -> Dict[str, Any]:
+        """Parse the INI data."""
         import configparser
 
         lowercase = self._lowercase
@@ -535,7 +809,7 @@ class INIConfiguration(FileConfiguration):
             for k, v in values.items()
             if section.startswith(self._section_prefix)
         }
-        self._config = self._flatten_dict(result)
+        return self._flatten_dict(result)
 
 
 def config_from_ini(
@@ -548,6 +822,8 @@ def config_from_ini(
     interpolate: InterpolateType = False,
     interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
     ignore_missing_paths: bool = False,
+    process_pool: Optional[Executor] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
 ) -> Configuration:
     """Create a [Configuration][config.configuration.Configuration] instance from an INI file.
 
@@ -558,6 +834,8 @@ def config_from_ini(
         lowercase_keys: whether to convert every key to lower case.
         interpolate: whether to apply string interpolation when looking for items.
         ignore_missing_paths: if true it will not throw on missing paths.
+        process_pool: executor to parse the data in, e.g. a `ProcessPoolExecutor`.
+        cache_dir: directory to cache the parsed contents of the file in.
 
     Returns:
         a [Configuration][config.configuration.Configuration] instance.
@@ -571,12 +849,16 @@ def config_from_ini(
         interpolate=interpolate,
         interpolate_type=interpolate_type,
         ignore_missing_paths=ignore_missing_paths,
+        process_pool=process_pool,
+        cache_dir=cache_dir,
     )
 
 
 class DotEnvConfiguration(FileConfiguration):
     """Configuration from a .env type file input."""
 
+    _parse_settings = ("_lowercase", "_prefix", "_separator", "_strip_prefix")
+
     def __init__(
         self,
         data: Union[str, Path, TextIO],
@@ -589,6 +871,8 @@ class DotEnvConfiguration(FileConfiguration):
         interpolate: InterpolateType = False,
         interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
         ignore_missing_paths: bool = False,
+        process_pool: Optional[Executor] = None,
+        cache_dir: Optional[Union[str, Path]] = None,
     ):
         """Class Constructor."""
         self._prefix = prefix
@@ -602,14 +886,16 @@ class DotEnvConfiguration(FileConfiguration):
             interpolate=interpolate,
             interpolate_type=interpolate_type,
             ignore_missing_paths=ignore_missing_paths,
+            process_pool=process_pool,
+            cache_dir=cache_dir,
         )
 
-    def _reload(
+    def _parse(
         self,
         data: Union[str, Path, TextIO],
         read_from_file: bool = False,
-    ) -> None:
-        """Reload the .env data."""
+    ) -> Dict[str, Any]:
+        """Parse the .env data."""
         if read_from_file:
             if isinstance(data, (str, Path)):
                 with open(data, "rt") as f:
@@ -628,7 +914,7 @@ class DotEnvConfiguration(FileConfiguration):
             if k.startswith(self._prefix)
         }
 
-        self._config = self._flatten_dict(result)
+        return self._flatten_dict(result)
 
 
 def config_from_dotenv(
@@ -642,6 +928,8 @@ def config_from_dotenv(
     interpolate: InterpolateType = False,
     interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
     ignore_missing_paths: bool = False,
+    process_pool: Optional[Executor] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
 ) -> Configuration:
     """Create a [Configuration][config.configuration.Configuration] instance from a .env type file.
 
@@ -654,6 +942,8 @@ def config_from_dotenv(
         lowercase_keys: whether to convert every key to lower case.
         interpolate: whether to apply string interpolation when looking for items.
         ignore_missing_paths: if true it will not throw on missing paths.
+        process_pool: executor to parse the data in, e.g. a `ProcessPoolExecutor`.
+        cache_dir: directory to cache the parsed contents of the file in.
 
     Returns:
         a [Configuration][config.configuration.Configuration] instance.
@@ -668,6 +958,8 @@ def config_from_dotenv(
         interpolate=interpolate,
         interpolate_type=interpolate_type,
         ignore_missing_paths=ignore_missing_paths,
+        process_pool=process_pool,
+        cache_dir=cache_dir,
     )
 
 
@@ -728,8 +1020,8 @@ class PythonConfiguration(Configuration):
         )
         self.reload()
 
-    def reload(self) -> None:
-        """Reload the path."""
+    def _load(self) -> Tuple[Dict[str, Any], Any]:
+        """Read the path."""
         if self._module is not None:
             variables = [
                 x
@@ -743,12 +1035,7 @@ class PythonConfiguration(Configuration):
             }
         else:
             result = {}
-        super().__init__(
-            result,
-            lowercase_keys=self._lowercase,
-            interpolate=self._interpolate,
-            interpolate_type=self._interpolate_type,
-        )
+        return self._flatten_dict(result), None
 
 
 def config_from_python(
@@ -849,6 +1136,8 @@ class YAMLConfiguration(FileConfiguration):
         interpolate: InterpolateType = False,
         interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
         ignore_missing_paths: bool = False,
+        process_pool: Optional[Executor] = None,
+        cache_dir: Optional[Union[str, Path]] = None,
     ):
         """Class Constructor."""
         if yaml is None:  # pragma: no cover
@@ -862,14 +1151,16 @@ class YAMLConfiguration(FileConfiguration):
             interpolate=interpolate,
             interpolate_type=interpolate_type,
             ignore_missing_paths=ignore_missing_paths,
+            process_pool=process_pool,
+            cache_dir=cache_dir,
         )
 
-    def _reload(
+    def _parse(
         self,
         data: Union[str, Path, TextIO],
         read_from_file: bool = False,
-    ) -> None:
-        """Reload the YAML data."""
+    ) -> Dict[str, Any]:
+        """Parse the YAML data."""
         if read_from_file and isinstance(data, (str, Path)):
             with open(data, "rt") as f:
                 loaded = yaml.load(f, Loader=yaml.FullLoader)
@@ -877,7 +1168,7 @@ class YAMLConfiguration(FileConfiguration):
             loaded = yaml.load(data, Loader=yaml.FullLoader)
         if not isinstance(loaded, Mapping):
             raise ValueError("Data should be a dictionary")
-        self._config = self._flatten_dict(loaded)
+        return self._flatten_dict(loaded)
 
 
 def config_from_yaml(
@@ -888,6 +1179,8 @@ def config_from_yaml(
     interpolate: InterpolateType = False,
     interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
     ignore_missing_paths: bool = False,
+    process_pool: Optional[Executor] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
 ) -> Configuration:
     """Return a Configuration instance from YAML files.
 
@@ -897,6 +1190,8 @@ def config_from_yaml(
         lowercase_keys: whether to convert every key to lower case.
         interpolate: whether to apply string interpolation when looking for items.
         ignore_missing_paths: if true it will not throw on missing paths.
+        process_pool: executor to parse the data in, e.g. a `ProcessPoolExecutor`.
+        cache_dir: directory to cache the parsed contents of the file in.
 
     Returns:
         a Configuration instance.
@@ -908,12 +1203,16 @@ def config_from_yaml(
         interpolate=interpolate,
         interpolate_type=interpolate_type,
         ignore_missing_paths=ignore_missing_paths,
+        process_pool=process_pool,
+        cache_dir=cache_dir,
     )
 
 
 class TOMLConfiguration(FileConfiguration):
     """Configuration from a TOML input."""
 
+    _parse_settings = ("_lowercase", "_section_prefix", "_strip_prefix")
+
     def __init__(
         self,
         data: Union[str, Path, TextIO],
@@ -925,6 +1224,8 @@ class TOMLConfiguration(FileConfiguration):
         interpolate: InterpolateType = False,
         interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
         ignore_missing_paths: bool = False,
+        process_pool: Optional[Executor] = None,
+        cache_dir: Optional[Union[str, Path]] = None,
     ):
         """Class Constructor."""
         if toml is None:  # pragma: no cover
@@ -941,14 +1242,16 @@ class TOMLConfiguration(FileConfiguration):
             interpolate=interpolate,
             interpolate_type=interpolate_type,
             ignore_missing_paths=ignore_missing_paths,
+            process_pool=process_pool,
+            cache_dir=cache_dir,
         )
 
-    def _reload(
+    def _parse(
         self,
         data: Union[str, Path, TextIO],
         read_from_file: bool = False,
-    ) -> None:
-        """Reload the TOML data."""
+    ) -> Dict[str, Any]:
+        """Parse the TOML data."""
         if read_from_file:
             if isinstance(data, (str, Path)):
                 with open(data, "rb") as f:
@@ -967,7 +1270,7 @@ class TOMLConfiguration(FileConfiguration):
             if k.startswith(self._section_prefix)
         }
 
-        self._config = result
+        return result
 
 
 def config_from_toml(
@@ -980,6 +1283,8 @@ def config_from_toml(
     interpolate: InterpolateType = False,
     interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
     ignore_missing_paths: bool = False,
+    process_pool: Optional[Executor] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
 ) -> Configuration:
     """Return a Configuration instance from TOML files.
 
@@ -989,6 +1294,8 @@ def config_from_toml(
         lowercase_keys: whether to convert every key to lower case.
         interpolate: whether to apply string interpolation when looking for items.
         ignore_missing_paths: if true it will not throw on missing paths.
+        process_pool: executor to parse the data in, e.g. a `ProcessPoolExecutor`.
+        cache_dir: directory to cache the parsed contents of the file in.
 
     Returns:
         a Configuration instance.
@@ -1002,4 +1309,6 @@ def config_from_toml(
         interpolate=interpolate,
         interpolate_type=interpolate_type,
         ignore_missing_paths=ignore_missing_paths,
+        process_pool=process_pool,
+        cache_dir=cache_dir,
     )
@@ -1,35 +1,101 @@
 """Configuration class."""
 
 import base64
+from collections import ChainMap
 from contextlib import contextmanager
-from copy import deepcopy
-from sys import version_info
+from copy import copy, deepcopy
+from itertools import count
+from sys import getsizeof
 from typing import (
     Any,
+    Callable,
     Dict,
     ItemsView,
+    Iterable,
     Iterator,
     KeysView,
     List,
     Mapping,
     Optional,
+    Set,
     Tuple,
     Union,
     ValuesView,
     cast,
 )
+from weakref import WeakValueDictionary
 
 from .helpers import (
     AttributeDict,
     InterpolateEnumType,
     InterpolateType,
+    KeyTrie,
+    PersistentMap,
+    RecordingChainMap,
     as_bool,
     clean,
+    deep_sizeof,
+    intern_key,
+    interpolate_all,
     interpolate_object,
 )
 
-if version_info < (3, 8):  # pragma: no cover
-    from collections import OrderedDict
+# source of the generation numbers, unique across every instance
+_generations = count()
+# marker for missing values
+_MISSING = object()
+
+
+def _b64encode(value: Any) -> bytes:
+    return base64.b64encode(value if isinstance(value, bytes) else value.encode())
+
+
+def _b64decode(value: Any) -> bytes:
+    b = value if isinstance(value, bytes) else value.encode()
+    return base64.b64decode(b, validate=True)
+
+
+class _Contents:
+    """The flat dictionary of a configuration, along with the state derived from it.
+
+    Reloads build a new instance and publish it with a single assignment, so
+    that a reader holding an instance sees consistent contents, and caches the
+    values it interpolates from an outdated instance in that instance only.
+    Writes to the configuration (item assignment, `update`, ...) change the
+    published instance in place, like they change the dictionary itself.
+    """
+
+    __slots__ = (
+        "config",
+        "index",
+        "generation",
+        "interpolated",
+        "dependents",
+        "source",
+    )
+
+    def __init__(
+        self,
+        config_: Dict[str, Any],
+        generation: Optional[int],
+        index: Optional[KeyTrie] = None,
+        source: Any = None,
+    ):
+        """Class Constructor.
+
+        Params:
+            config_: flat dictionary.
+            generation: generation of the contents, None if changes are not tracked.
+            index: prefix index over the keys of the dictionary, built when needed.
+            source: description of where the contents were read from.
+        """  # noqa: E501
+        self.config = config_
+        self.index = index
+        self.generation = generation
+        # interpolated values by key, and the cached keys depending on each key
+        self.interpolated: Dict[str, Any] = {}
+        self.dependents: Dict[str, Set[str]] = {}
+        self.source = source
 
 
 class Configuration:
@@ -47,6 +113,21 @@ class Configuration:
         - ``a2.b2.c2``
     """
 
+    # the flat dictionary along with its key index, generation and caches
+    _contents: Optional[_Contents] = None
+    # whether `_config` is provided by the subclass instead of `_contents`
+    _derived_storage = False
+    # live views sharing `_config` (by id), detached before it is mutated
+    _views: Optional["WeakValueDictionary[int, ConfigurationView]"] = None
+    # live copies sharing `_config` and its index (by id), see `copy`
+    _sharing: Optional["WeakValueDictionary[int, Configuration]"] = None
+    # keys grouped by number of levels, along with the generation they match
+    _groupings: Optional[Tuple[Any, Dict[Optional[int], List[str]]]] = None
+    # values converted by the typed getters, along with the generation they match
+    _typed: Optional[Tuple[Any, Dict[Tuple[str, str], Any]]] = None
+    # whether keys and key segments are interned, see `compact`
+    _compact = False
+
     def __init__(
         self,
         config_: Mapping[str, Any],
@@ -63,38 +144,100 @@ class Configuration:
         self._lowercase = lowercase_keys
         self._interpolate = {} if interpolate is True else interpolate
         self._interpolate_type = interpolate_type
-        self._config: Dict[str, Any] = self._flatten_dict(config_)
+        self._contents = _Contents(self._flatten_dict(config_), next(_generations))
         self._default_levels: Optional[int] = 1
 
-    def __eq__(self, other):  # type: ignore
-        """Equality operator."""
-        if not isinstance(other, (Configuration, Mapping)):
-            return False
-        return self.as_dict() == Configuration(other).as_dict()
+    def __init_subclass__(cls, **kwargs: Any) -> None:  # noqa: D105
+        super().__init_subclass__(**kwargs)
+        if "_config" in cls.__dict__:
+            cls._derived_storage = True
 
-    def _filter_dict(self, d: Dict[str, Any], prefix: str) -> Dict[str, Any]:
-        """Filter a dictionary and return the items that are prefixed by `prefix`.
+    def __getstate__(self) -> Dict[str, Any]:  # noqa: D105
+        # views and copies sharing the storage are only tracked in this process
+        state = dict(self.__dict__)
+        state.pop("_views", None)
+        state.pop("_sharing", None)
+        return state
 
-        Params:
-            d: dictionary.
-            prefix: prefix to filter on.
-        """
-        if self._lowercase:
-            return {
-                k[(len(prefix) + 1) :].lower(): v
-                for k, v in d.items()
-                for k, v in d.items()
-                if k.startswith(prefix + ".")
-            }
+    def __setstate__(self, state: Dict[str, Any]) -> None:  # noqa: D105
+        self.__dict__.update(state)
+
+    @property
+    def _config(self) -> Dict[str, Any]:
+        """Flat dictionary backing the instance."""
+        return self._current().config
+
+    @_config.setter
+    def _config(self, config_: Dict[str, Any]) -> None:
+        # subclasses assigning the flat dictionary publish it like a reload
+        self._replace_config(config_)
+
+    def _read_config(self) -> Dict[str, Any]:
+        """Return the flat dictionary for reading only, which must not be modified.
+
+        Unlike `_config`, it never prepares the storage for writes, so that views
+        keep sharing the storage of the instance they were created from.
+        """
+        return self._config
+
+    @property
+    def _generation(self) -> Optional[int]:
+        """Changes whenever the contents change; None if changes cannot be tracked."""
+        contents = self._contents
+        return None if contents is None else contents.generation
+
+    @_generation.setter
+    def _generation(self, value: Optional[int]) -> None:
+        contents = self._contents
+        if contents is None:
+            self._contents = _Contents({}, value)
         else:
-            return {
-                k[(len(prefix) + 1) :]: v
-                for k, v in d.items()
-                if k.startswith(prefix + ".")
-            }
+            contents.generation = value
+
+    @property
+    def _interpolated(self) -> Optional[Dict[str, Any]]:
+        """Interpolated values by key, cached for the published contents."""
+        contents = self._contents
+        return None if contents is None else contents.interpolated
+
+    @classmethod
+    def from_flat(
+        cls,
+        config_: Dict[str, Any],
+        lowercase_keys: bool = False,
+        interpolate: InterpolateType = False,
+        interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
+    ) -> "Configuration":
+        """Create a configuration from a dictionary that is already flat.
+
+        Unlike the constructor, the keys and values are not walked: the
+        dictionary becomes the storage of the new instance, so it should not
+        be modified afterwards. Its values must not be mappings, and its keys
+        must already be in lower case if `lowercase_keys` is set.
+
+        Params:
+            config_: a flat dictionary with dotted keys.
+            lowercase_keys: whether to convert the keys of later updates to lower case.
+        """  # noqa: E501
+        cfg = cls.__new__(cls)
+        Configuration.__init__(cfg, {}, lowercase_keys, interpolate, interpolate_type)
+        cfg._contents = _Contents(config_, next(_generations))
+        return cfg
+
+    def __eq__(self, other):  # type: ignore
+        """Equality operator."""
+        if isinstance(other, Configuration):
+            return self._config == other._config
+        if not isinstance(other, Mapping):
+            return False
+        return self._config == Configuration(other)._config
 
     def _flatten_dict(self, d: Mapping[str, Any]) -> Dict[str, Any]:
-        """Flatten one level of a dictionary.
+        """Flatten a nested dictionary into dotted keys.
+
+        The dictionary is walked with an explicit stack, so that the nesting
+        depth is not limited by the recursion limit. On conflicts, values
+        stored directly in a mapping win over the values of nested mappings.
 
         Params:
             d: dict.
@@ -102,31 +245,228 @@ class Configuration:
         Returns:
             a flattened dict.
         """
-        nested = {k for k, v in d.items() if isinstance(v, (Mapping, Configuration))}
-        if self._lowercase:
-            result = {
-                k.lower() + "." + ki: vi
-                for k in nested
-                for ki, vi in self._flatten_dict(d[k]).items()
-            }
-            result.update(
-                (k.lower(), v)
-                for k, v in d.items()
-                if not isinstance(v, (Mapping, Configuration))
+        lowercase = self._lowercase
+        result: Dict[str, Any] = {}
+        # (prefix, mapping, whether its nested mappings were already expanded)
+        stack: List[Tuple[str, Any, bool]] = [("", d, False)]
+        while stack:
+            prefix, m, expanded = stack.pop()
+            items = (
+                m._read_config().items() if isinstance(m, Configuration) else m.items()
             )
-        else:
-            result = {
-                k + "." + ki: vi
-                for k in nested
-                for ki, vi in self._flatten_dict(d[k]).items()
-            }
-            result.update(
-                (k, v)
-                for k, v in d.items()
-                if not isinstance(v, (Mapping, Configuration))
+            if expanded:
+                for k, v in items:
+                    if not isinstance(v, (Mapping, Configuration)):
+                        k = k.lower() if lowercase else k
+                        result[prefix + k if prefix else k] = v
+                continue
+            stack.append((prefix, m, True))
+            stack.extend(
+                reversed(
+                    [
+                        (prefix + (k.lower() if lowercase else k) + ".", v, False)
+                        for k, v in items
+                        if isinstance(v, (Mapping, Configuration))
+                    ],
+                ),
             )
         return result
 
+    def _current(self, build_index: bool = False) -> _Contents:
+        """Return the published contents, in sync with the storage of the instance.
+
+        Params:
+            build_index: whether to build the key index if it is missing or out
+                of sync with the dictionary, instead of dropping it.
+        """  # noqa: E501
+        # read once, as a reload may publish new contents concurrently
+        contents = self._contents
+        if self._derived_storage:
+            config_ = self._config
+            if contents is None or contents.config is not config_:
+                generation = None if contents is None else contents.generation
+                contents = self._contents = _Contents(config_, generation)
+        contents = cast(_Contents, contents)
+        trie = contents.index
+        if trie is not None and len(trie) != len(contents.config):
+            contents.index = trie = None
+        if trie is None and build_index:
+            contents.index = KeyTrie(contents.config, intern=self._compact)
+        return contents
+
+    def _key_index(self) -> Tuple[Dict[str, Any], KeyTrie]:
+        """Return `_config` along with its key index, building the index if needed."""
+        contents = self._current(build_index=True)
+        return contents.config, cast(KeyTrie, contents.index)
+
+    def _storage(self) -> Tuple[Dict[str, Any], KeyTrie, str]:
+        """Return the flat dictionary, key index and key prefix backing the instance."""  # noqa: E501
+        config_, trie = self._key_index()
+        return config_, trie, ""
+
+    def _register_view(self, view: "ConfigurationView") -> "Configuration":
+        """Keep track of a view sharing the storage of this instance.
+
+        Returns:
+            the instance owning the shared storage.
+        """
+        if self._views is None:
+            self._views = WeakValueDictionary()
+        self._views[id(view)] = view
+        return self
+
+    def _prepare_write(self) -> None:
+        """Make the storage of this instance private before mutating it.
+
+        Views sharing the storage are detached, and the storage shared with
+        copies is copied, along with the path of the key index being changed.
+        """
+        views = self._views
+        if views:
+            for view in list(views.values()):
+                view._detach()
+            views.clear()
+        if self._unshare():
+            contents = self._current(build_index=True)
+            private = _Contents(
+                dict(contents.config),
+                contents.generation,
+                cast(KeyTrie, contents.index).copy(),
+                contents.source,
+            )
+            private.interpolated = contents.interpolated
+            private.dependents = contents.dependents
+            self._contents = private
+
+    def _unshare(self) -> bool:
+        """Stop sharing the storage with copies.
+
+        Returns:
+            whether any other copy still uses the storage.
+        """
+        sharing = self._sharing
+        if sharing is None:
+            return False
+        self._sharing = None
+        sharing.pop(id(self), None)
+        return bool(sharing)
+
+    def _bump_generation(self) -> None:
+        """Mark the contents as changed, unless changes are not being tracked."""
+        if self._generation is not None:
+            self._generation = next(_generations)
+
+    def _replace_config(self, config_: Dict[str, Any], source: Any = None) -> bool:
+        """Replace the flat dictionary backing the instance, e.g. when reloading.
+
+        The new contents (dictionary, key index, interpolation cache and
+        generation) are built off to the side and then published with a single
+        assignment, so that readers in other threads see either the old or the
+        new contents, never a partial update. The replaced dictionary is left
+        untouched, and only `source` is updated if the contents did not change.
+
+        Params:
+            config_: flattened dictionary.
+            source: description of where the contents were read from, e.g. the
+                signature of a file.
+
+        Returns:
+            whether the contents changed.
+        """
+        staged = self._stage_config(config_, source)
+        if staged is None:
+            return False
+        self._publish_contents(*staged)
+        return staged[1]
+
+    def _stage_config(
+        self,
+        config_: Dict[str, Any],
+        source: Any = None,
+    ) -> Optional[Tuple[_Contents, bool]]:
+        """Build the contents `_replace_config` publishes, without publishing them.
+
+        Returns:
+            the new contents and whether they differ from the published ones,
+            or None if neither the dictionary nor its source changed.
+        """
+        old = self._current()
+        if config_ == old.config:
+            if source == old.source:
+                return None
+            same = _Contents(old.config, old.generation, old.index, source)
+            same.interpolated, same.dependents = old.interpolated, old.dependents
+            return same, False
+        if self._compact:
+            config_ = {intern_key(k): v for k, v in config_.items()}
+        new = _Contents(
+            config_,
+            None if old.generation is None else next(_generations),
+            KeyTrie(config_, intern=self._compact),
+            source,
+        )
+        if old.interpolated:
+            # readers may be using the published cache, so update a copy
+            cached = dict(old.interpolated)
+            dependents = {k: set(v) for k, v in old.dependents.items()}
+            previous = old.config
+            for key in previous.keys() | config_.keys():
+                if (
+                    key not in previous
+                    or key not in config_
+                    or previous[key] != config_[key]
+                ):
+                    for item in dependents.pop(key, ()):
+                        cached.pop(item, None)
+            new.interpolated, new.dependents = cached, dependents
+        return new, True
+
+    def _publish_contents(self, contents: _Contents, changed: bool) -> None:
+        """Publish contents built by `_stage_config`."""
+        if changed:
+            self._unshare()
+        self._contents = contents
+
+    def _interpolate_value(
+        self,
+        item: str,
+        value: Any,
+        config_: Dict[str, Any],
+    ) -> Any:
+        """Interpolate the value of `item`, caching the result with its dependencies.
+
+        Params:
+            item: key.
+            value: raw value of the key.
+            config_: flat dictionary the value was read from.
+        """
+        contents = self._contents
+        if contents is None or contents.config is not config_:
+            # the value was read from contents that were replaced since
+            contents = None
+        elif item in contents.interpolated:
+            return deepcopy(contents.interpolated[item])
+        d = RecordingChainMap(cast(dict, self._interpolate), config_)
+        result = interpolate_object(item, value, [d], self._interpolate_type)
+        # untracked instances can change anytime
+        if contents is not None and contents.generation is not None:
+            contents.interpolated[item] = result
+            dependents = contents.dependents
+            for key in d.keys_read | {item}:
+                dependents.setdefault(key, set()).add(item)
+            return deepcopy(result)
+        return result
+
+    def _invalidate_interpolation(self, keys: Iterable[str]) -> None:
+        """Drop the cached interpolated values that depend on any of `keys`."""
+        contents = self._contents
+        if contents is None or not contents.interpolated:
+            return
+        cached, dependents = contents.interpolated, contents.dependents
+        for key in keys:
+            for item in dependents.pop(key, ()):
+                cached.pop(item, None)
+
     def _get_subset(self, prefix: str) -> Union[Dict[str, Any], Any]:
         """Return the subset of the config dictionary whose keys start with `prefix`.
 
@@ -136,39 +476,41 @@ class Configuration:
         Returns:
             dict.
         """  # noqa: E501
-        d = {
-            k[(len(prefix) + 1) :]: v
-            for k, v in self._config.items()
-            if k.startswith(prefix + ".")
-        }
-        if not d:
-            prefixes = prefix.split(".")
-            if len(prefixes) == 1:
-                return deepcopy(self._config.get(prefix, {}))
-            d = self._config
-            while prefixes:  # pragma: no branches
-                p = prefixes[0]
-                new_d = self._filter_dict(d, p)
-                if new_d == {}:
-                    return deepcopy(d.get(p, {}) if len(prefixes) == 1 else {})
-                d = new_d
-                prefixes = prefixes[1:]
-        return deepcopy(d)
-
-    def __getitem__(self, item: str) -> Union["Configuration", Any]:  # noqa: D105
-        v = self._get_subset(item)
-
+        config_, trie, base = self._storage()
+        prefix = base + prefix
+        node = trie.find(prefix)
+        if node is None:
+            return {}
+        if node.size > (node.key is not None):
+            n = len(prefix) + 1
+            return deepcopy(
+                {k[n:]: config_[k] for k in KeyTrie.iter_keys(node, strict=True)},
+            )
+        return deepcopy(config_.get(prefix, {}))
+
+    def _lookup(self, item: str, default: Any) -> Any:
+        """Return the value of `item` like item access does, or `default` if missing."""
+        config_, trie, base = self._storage()
+        node = trie.find(base + item)
+        if node is None:
+            return default
+        if node.size > (node.key is not None):
+            return ConfigurationView(self, item)
+
+        v = deepcopy(config_.get(base + item, {}))
         if v == {}:
-            raise KeyError(item)
-        if isinstance(v, Mapping):
-            return Configuration(v)
-        elif self._interpolate is not False:
-            d = self.as_dict()
-            d.update(self._interpolate)
-            return interpolate_object(item, v, [d], self._interpolate_type)
+            return default
+        if self._interpolate is not False:
+            return self._interpolate_value(item, v, config_)
         else:
             return v
 
+    def __getitem__(self, item: str) -> Union["Configuration", Any]:  # noqa: D105
+        value = self._lookup(item, _MISSING)
+        if value is _MISSING:
+            raise KeyError(item)
+        return value
+
     def __getattr__(self, item: str) -> Any:  # noqa: D105
         try:
             return self[item]
@@ -185,11 +527,46 @@ class Configuration:
         Returns:
             the value found or a default.
         """
-        return self.as_dict().get(key, default)
+        config_, _, base = self._storage()
+        return config_.get(base + key, default)
+
+    def get_many(self, keys: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        """Get the configuration values corresponding to several keys at once.
+
+        Params:
+            keys: keys to retrieve.
+            default: default value for the missing keys.
+
+        Returns:
+            a dictionary with the value of each key, as returned by item
+            access, or the default.
+        """
+        return {key: self._lookup(key, default) for key in keys}
 
     def as_dict(self) -> dict:
-        """Return the representation as a dictionary."""
-        return self._config
+        """Return the representation as a dictionary.
+
+        The dictionary is a copy of the flat storage, so changing it does not
+        change the configuration.
+        """
+        return dict(self._config)
+
+    def resolve(self) -> "Configuration":
+        """Return a snapshot of the configuration with every value interpolated.
+
+        The interpolation variables are resolved once each, in dependency order,
+        instead of every time a value is read.
+        """
+        config_ = self._read_config()
+        if self._interpolate is False:
+            return Configuration.from_flat(dict(config_))
+        return Configuration.from_flat(
+            interpolate_all(
+                config_,
+                [ChainMap(cast(dict, self._interpolate), config_)],
+                self._interpolate_type,
+            ),
+        )
 
     def as_attrdict(self) -> AttributeDict:
         """Return the representation as an attribute dictionary."""
@@ -200,13 +577,36 @@ class Configuration:
             },
         )
 
+    def _typed_value(
+        self,
+        kind: str,
+        item: str,
+        convert: Callable[[Any], Any],
+    ) -> Any:
+        """Return the value of `item` converted by `convert`.
+
+        The result is cached by `kind` and key until the configuration changes.
+        """
+        generation = self._generation
+        if generation is None:  # untracked instances can change anytime
+            return convert(self[item])
+        typed = self._typed
+        if typed is None or typed[0] != generation:
+            typed = self._typed = (generation, {})
+        try:
+            return typed[1][(kind, item)]
+        except KeyError:
+            pass
+        value = typed[1][(kind, item)] = convert(self[item])
+        return value
+
     def get_bool(self, item: str) -> bool:
         """Get the item value as a bool.
 
         Params:
             item: key
         """
-        return as_bool(self[item])
+        return cast(bool, self._typed_value("bool", item, as_bool))
 
     def get_str(self, item: str, fmt: str = "{}") -> str:
         """Get the item value as an int.
@@ -223,7 +623,7 @@ class Configuration:
         Params:
             item: key
         """
-        return int(self[item])
+        return cast(int, self._typed_value("int", item, int))
 
     def get_float(self, item: str) -> float:
         """Get the item value as a float.
@@ -231,7 +631,7 @@ class Configuration:
         Params:
             item: key
         """
-        return float(self[item])
+        return cast(float, self._typed_value("float", item, float))
 
     def get_list(self, item: str) -> List[Any]:
         """Get the item value as a list.
@@ -239,7 +639,7 @@ class Configuration:
         Params:
             item: key
         """
-        return list(self[item])
+        return deepcopy(self._typed_value("list", item, list))
 
     def get_dict(self, item: str) -> dict:
         """Get the item values as a dictionary.
@@ -255,9 +655,7 @@ class Configuration:
         Params:
             item: key
         """
-        b = self[item]
-        b = b if isinstance(b, bytes) else b.encode()
-        return base64.b64encode(b)
+        return cast(bytes, self._typed_value("base64encode", item, _b64encode))
 
     def base64decode(self, item: str) -> bytes:
         """Get the item value as a Base64 decoded bytes instance.
@@ -265,9 +663,58 @@ class Configuration:
         Params:
             item: key
         """
-        b = self[item]
-        b = b if isinstance(b, bytes) else b.encode()
-        return base64.b64decode(b, validate=True)
+        return cast(bytes, self._typed_value("base64decode", item, _b64decode))
+
+    def accessor(
+        self,
+        key: str,
+        type: Optional[Callable[[Any], Any]] = None,  # noqa: A002
+    ) -> "Accessor":
+        """Return a handle on `key` for repeated reads.
+
+        The handle resolves and converts the value once, and only looks it up
+        again after the configuration changes.
+
+        Params:
+            key: key to read.
+            type: optional conversion to apply to the value, e.g. `int`.
+        """
+        return Accessor(self, key, type)
+
+    def _level_keys(self, levels: Optional[int]) -> List[str]:
+        """Return the keys truncated to `levels` segments, grouped from the key index.
+
+        The grouping is computed once per generation and number of levels, so
+        that iterating and measuring the configuration repeatedly is cheap.
+        Callers must not mutate the returned list.
+        """  # noqa: E501
+        generation = self._generation
+        groupings = self._groupings
+        if groupings is not None and groupings[0] == generation:
+            keys = groupings[1].get(levels)
+            if keys is not None:
+                return keys
+        _, trie, base = self._storage()
+        node = trie.find(base[:-1]) if base else trie.root
+        keys = KeyTrie.level_keys(node, levels) if node is not None else []
+        if generation is not None:  # untracked instances can change anytime
+            if groupings is None or groupings[0] != generation:
+                groupings = self._groupings = (generation, {})
+            groupings[1][levels] = keys
+        return keys
+
+    def _has_level_key(self, key: Any, levels: Optional[int]) -> bool:
+        """Check whether `key` is one of the keys truncated to `levels` segments."""
+        if not isinstance(key, str):
+            return False
+        _, trie, base = self._storage()
+        node = trie.find(base + key)
+        if node is None:
+            return False
+        if levels is None:
+            return node.key is not None
+        depth = key.count(".") + 1
+        return depth == levels or (depth < levels and node.key is not None)
 
     def keys(
         self,
@@ -279,15 +726,7 @@ class Configuration:
         try:
             return self["keys"]  # don't filter levels, existing attribute
         except KeyError:
-            return cast(
-                KeysView[str],
-                list(
-                    {
-                        ".".join(x.split(".")[:levels])
-                        for x in set(self.as_dict().keys())
-                    },
-                ),
-            )
+            return ConfigurationKeysView(self, levels)
 
     def values(
         self,
@@ -299,7 +738,7 @@ class Configuration:
         try:
             return self["values"]
         except KeyError:
-            return dict(self.items(levels=levels)).values()
+            return ConfigurationValuesView(self, levels)
 
     def items(
         self,
@@ -311,22 +750,16 @@ class Configuration:
         try:
             return self["items"]
         except KeyError:
-            keys = cast(KeysView[str], self.keys(levels=levels))
-            return {k: self._get_subset(k) for k in keys}.items()
+            return ConfigurationItemsView(self, levels)
 
     def __iter__(self) -> Iterator[Tuple[str, Any]]:  # noqa: D105
-        return iter(dict(self.items()))  # type: ignore
+        return iter(self._level_keys(self._default_levels))  # type: ignore
 
     def __reversed__(self) -> Iterator[Tuple[str, Any]]:  # noqa: D105
-        if version_info < (3, 8):
-            return OrderedDict(
-                reversed(list(self.items())),
-            )  # type: ignore  # pragma: no cover
-        else:
-            return reversed(dict(self.items()))  # type: ignore
+        return reversed(self._level_keys(self._default_levels))  # type: ignore
 
     def __len__(self) -> int:  # noqa: D105
-        return len(self.keys())
+        return len(self._level_keys(self._default_levels))
 
     def __setitem__(self, key: str, value: Any) -> None:  # noqa: D105
         self.update({key: value})
@@ -337,30 +770,94 @@ class Configuration:
         Params:
             prefix: prefix to filter on to delete keys
         """
-        remove = []
-        for k in self._config:
-            kl = k.lower() if self._lowercase else k
-            if kl == prefix or kl.startswith(prefix + "."):
-                remove.append(k)
+        self._prepare_write()
+        config_, trie = self._key_index()
+        remove = trie.remove_prefix(prefix)
         if not remove:
             raise KeyError("No key with prefix '%s' found." % prefix)
         for k in remove:
-            del self._config[k]
+            del config_[k]
+        self._invalidate_interpolation(remove)
+        self._bump_generation()
 
     def __contains__(self, prefix: str) -> bool:  # noqa: D105
-        try:
-            self[prefix]
-            return True
-        except KeyError:
+        # only look at the key index, without building or interpolating values
+        config_, trie, base = self._storage()
+        node = trie.find(base + prefix)
+        if node is None:
             return False
+        if node.size > (node.key is not None):
+            return True
+        value = config_.get(base + prefix, _MISSING)
+        return value is not _MISSING and not (isinstance(value, Mapping) and not value)
 
     def clear(self) -> None:
         """Remove all items."""
-        self._config.clear()
+        self._prepare_write()
+        contents = self._current()
+        contents.config.clear()
+        self._contents = _Contents(contents.config, contents.generation)
+        self._bump_generation()
 
     def copy(self) -> "Configuration":
-        """Return shallow copy."""
-        return Configuration(self._config)
+        """Return shallow copy.
+
+        The copy is a plain `Configuration` with the same settings, sharing the
+        storage of the instance so that it is created in O(1). The first write
+        to either of them copies the flat dictionary and only the path of the
+        key index leading to the changed keys.
+        """
+        settings = (self._lowercase, self._interpolate, self._interpolate_type)
+        if self._generation is None:  # the storage is not managed by the instance
+            return Configuration.from_flat(dict(self._config), *settings)
+        new = Configuration.from_flat({}, *settings)
+        new._default_levels = self._default_levels
+        self._share_storage(new, source=False)
+        return new
+
+    def _clone(self) -> "Configuration":
+        """Return a copy of the instance that keeps its class and attributes.
+
+        The clone shares the storage like `copy` does, so that e.g. a file
+        configuration keeps reading from its file and can be reloaded. Instances
+        whose storage is provided by the subclass fall back to `copy`.
+        """
+        if self._generation is None or self._derived_storage:
+            return self.copy()
+        new = copy(self)
+        self._share_storage(new, source=True)
+        return new
+
+    def _share_storage(self, new: "Configuration", source: bool) -> None:
+        """Make `new` share the storage of the instance until either is written to.
+
+        Params:
+            new: instance to share the storage with.
+            source: whether `new` keeps the description of where the contents
+                were read from.
+        """
+        contents = self._current(build_index=True)
+        if self._sharing is None:
+            self._sharing = WeakValueDictionary()
+            self._sharing[id(self)] = self
+        new._contents = _Contents(
+            contents.config,
+            next(_generations),
+            contents.index,
+            contents.source if source else None,
+        )
+        new._compact = self._compact
+        new._sharing = self._sharing
+        self._sharing[id(new)] = new
+
+    def freeze(self) -> "FrozenConfiguration":
+        """Return an immutable and hashable snapshot of the configuration."""
+        return FrozenConfiguration(
+            self._read_config(),
+            lowercase_keys=self._lowercase,
+            interpolate=self._interpolate,
+            interpolate_type=self._interpolate_type,
+        )
 
     def pop(self, prefix: str, value: Any = None) -> Any:
         """Remove keys with the specified prefix and return the corresponding value.
@@ -388,13 +885,104 @@ class Configuration:
 
     def update(self, other: Mapping[str, Any]) -> None:
         """Update the Configuration with another Configuration object or Mapping."""
-        self._config.update(self._flatten_dict(other))
+        flat = self._flatten_dict(other)
+        if self._compact:
+            flat = {intern_key(k): v for k, v in flat.items()}
+        self._prepare_write()
+        contents = self._current()
+        trie = contents.index
+        contents.config.update(flat)
+        if trie is not None:
+            for k in flat:
+                trie.add(k)
+        self._invalidate_interpolation(flat)
+        self._bump_generation()
+
+    def compact(self) -> None:
+        """Reduce the memory used by the keys of the configuration.
+
+        Keys and the segments of the key index are interned from then on, so
+        that the same key in different configurations, and the same segment in
+        different keys of the index, share a single string. The flat dictionary
+        still holds every key as a full dotted string.
+        """
+        self._prepare_write()
+        self._compact = True
+        # the contents do not change, so the caches and generation are kept
+        old = self._current()
+        config_ = {intern_key(k): v for k, v in old.config.items()}
+        new = _Contents(
+            config_,
+            old.generation,
+            KeyTrie(config_, intern=True),
+            old.source,
+        )
+        new.interpolated, new.dependents = old.interpolated, old.dependents
+        self._contents = new
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Return an estimate of the memory used by the configuration, in bytes.
+
+        The report breaks down the size of the flat dictionary (`table`), its
+        `keys` and `values` and the key `index`, along with their `total`.
+        Objects shared by several entries are only counted once.
+        """
+        return self._memory_usage(set())
+
+    def _memory_usage(self, seen: Set[int]) -> Dict[str, int]:
+        config_, trie, _ = self._storage()
+        seen.add(id(config_))
+        report = {
+            "table": getsizeof(config_),
+            "keys": sum(deep_sizeof(k, seen) for k in config_),
+            "values": sum(deep_sizeof(v, seen) for v in config_.values()),
+            "index": trie.sizeof(seen),
+        }
+        report["total"] = sum(report.values())
+        return report
 
-    def reload(self) -> None:  # pragma: no cover
+    def _apply(self, changes: Mapping[str, Any], removed: Iterable[str]) -> None:
+        """Set and remove keys of the flat dictionary, trusting them to be flat.
+
+        Params:
+            changes: flat keys and values to set.
+            removed: keys to remove, leaving the keys below them untouched.
+        """
+        self._prepare_write()
+        config_, trie = self._key_index()
+        removed = [k for k in removed if k in config_]
+        for k in removed:
+            del config_[k]
+            trie.discard(k)
+        config_.update(changes)
+        for k in changes:
+            trie.add(k)
+        self._invalidate_interpolation(removed)
+        self._invalidate_interpolation(changes)
+        self._bump_generation()
+
+    def reload(self) -> bool:
         """Reload the configuration.
 
-        This method is not implemented for simple Configuration objects and is
-        intended only to be used in subclasses.
+        The new contents are read with `_load` and then published with
+        `_replace_config`.
+
+        Returns:
+            whether the contents changed.
+        """
+        loaded = self._load()
+        return loaded is not None and self._replace_config(*loaded)
+
+    def _load(self) -> Optional[Tuple[Dict[str, Any], Any]]:  # pragma: no cover
+        """Read the new contents of the configuration without publishing them.
+
+        This method is not implemented for simple Configuration objects, nor for
+        configurations fetching their values lazily, and is intended only to be
+        used in subclasses.
+
+        Returns:
+            the arguments to publish the new contents with `_replace_config`, or
+            None if there is nothing to publish (e.g. files that did not change).
         """
         raise NotImplementedError()
 
@@ -413,7 +1001,11 @@ class Configuration:
                 "Validation requires the `jsonschema` library.",
             ) from None
         try:
-            validate(self.as_attrdict() if nested else self.as_dict(), schema, **kwargs)
+            validate(
+                self.as_attrdict() if nested else self._read_config(),
+                schema,
+                **kwargs,
+            )
         except ValidationError as err:
             if raise_on_error:
                 raise err
@@ -438,4 +1030,417 @@ class Configuration:
         return "<%s: %s>" % (type(self).__name__, hex(id(self)))
 
     def __str__(self) -> str:  # noqa: D105
-        return str({k: clean(k, v) for k, v in sorted(self.as_dict().items())})
+        return str({k: clean(k, v) for k, v in sorted(self._read_config().items())})
+
+
+class ConfigurationView(Configuration):
+    """Copy-on-write view on a subset of a [Configuration][config.configuration.Configuration].
+
+    Views are returned when looking up a prefix and share the storage of the
+    instance they were created from, translating keys on the fly instead of
+    copying the matching values. Views can be written to: the first write to
+    either side copies the subset into the view, so that changes are never
+    visible across them.
+    """  # noqa: E501
+
+    _source: Optional[Tuple[Dict[str, Any], KeyTrie]] = None
+    _owner: Optional[Configuration] = None
+    _owned: Optional[Dict[str, Any]] = None
+
+    def __init__(self, parent: Configuration, prefix: str):
+        """Class Constructor.
+
+        Params:
+            parent: configuration to create the view from.
+            prefix: prefix of the keys in the view.
+        """
+        config_, trie, base = parent._storage()
+        self._source = (config_, trie)
+        self._prefix = base + prefix + "."
+        self._lowercase = False
+        self._interpolate = False
+        self._interpolate_type = InterpolateEnumType.STANDARD
+        self._generation = next(_generations)
+        self._default_levels = 1
+        self._owner = parent._register_view(self)
+
+    def _shared_subset(self) -> Dict[str, Any]:
+        """Return the keys and values of the shared storage covered by the view.
+
+        The values are not copied, so they must not be modified.
+        """
+        config_, trie = cast(Tuple[Dict[str, Any], KeyTrie], self._source)
+        node = trie.find(self._prefix[:-1])
+        if node is None:
+            return {}
+        n = len(self._prefix)
+        return {k[n:]: config_[k] for k in KeyTrie.iter_keys(node, strict=True)}
+
+    def _detach(self) -> None:
+        """Copy the subset of the shared storage into the view."""
+        if self._source is None:
+            return
+        self._owned = deepcopy(self._shared_subset())
+        self._source = self._owner = None
+
+    def __getstate__(self) -> Dict[str, Any]:  # noqa: D105
+        state = super().__getstate__()
+        if self._source is not None:
+            # the copy owns the subset instead of sharing the storage
+            state["_owned"] = self._shared_subset()
+            state["_source"] = state["_owner"] = None
+        return state
+
+    @property  # type: ignore[misc]
+    def _config(self) -> Dict[str, Any]:
+        self._detach()
+        return cast(Dict[str, Any], self._owned)
+
+    def _read_config(self) -> Dict[str, Any]:
+        if self._source is None:
+            return cast(Dict[str, Any], self._owned)
+        return self._shared_subset()
+
+    def _storage(self) -> Tuple[Dict[str, Any], KeyTrie, str]:
+        if self._source is None:
+            return super()._storage()
+        config_, trie = self._source
+        return config_, trie, self._prefix
+
+    def _register_view(self, view: "ConfigurationView") -> Configuration:
+        if self._source is None:
+            return super()._register_view(view)
+        return cast(Configuration, self._owner)._register_view(view)
+
+    def _prepare_write(self) -> None:
+        self._detach()
+        super()._prepare_write()
+
+    def as_dict(self) -> dict:
+        """Return the representation as a dictionary.
+
+        The values are copied while the view shares the storage, so that
+        changing them changes neither the view nor the instance it was created
+        from, and the view keeps sharing the storage.
+        """
+        if self._source is None:
+            return dict(cast(Dict[str, Any], self._owned))
+        return deepcopy(self._shared_subset())
+
+    def copy(self) -> Configuration:
+        """Return a copy of the subset of the storage covered by the view."""
+        return Configuration.from_flat(self.as_dict())
+
+
+class ConfigurationKeysView(KeysView[str]):
+    """Lazy view on the keys of a configuration, truncated to a number of levels.
+
+    Like the views of a dictionary, it reflects the current contents of the
+    configuration. Membership tests and `len` use the key index, and the keys
+    are produced on demand.
+    """
+
+    __slots__ = ("_levels",)
+
+    _mapping: Configuration
+
+    def __init__(self, cfg: Configuration, levels: Optional[int]):
+        """Class Constructor.
+
+        Params:
+            cfg: configuration to create the view from.
+            levels: number of levels to truncate the keys to, or None for all.
+        """
+        super().__init__(cfg)  # type: ignore [arg-type]
+        self._levels = levels
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._mapping._level_keys(self._levels))
+
+    def __contains__(self, key: object) -> bool:  # noqa: D105
+        return self._mapping._has_level_key(key, self._levels)
+
+    def __iter__(self) -> Iterator[str]:  # noqa: D105
+        return iter(self._mapping._level_keys(self._levels))
+
+    def __reversed__(self) -> Iterator[str]:  # noqa: D105
+        return reversed(self._mapping._level_keys(self._levels))
+
+    def __repr__(self) -> str:  # noqa: D105
+        return "%s(%r)" % (type(self).__name__, list(self))
+
+
+class ConfigurationValuesView(ValuesView[Any]):
+    """Lazy view on the values of a configuration, grouped by a number of levels."""
+
+    __slots__ = ("_levels",)
+
+    _mapping: Configuration
+
+    def __init__(self, cfg: Configuration, levels: Optional[int]):
+        """Class Constructor.
+
+        Params:
+            cfg: configuration to create the view from.
+            levels: number of levels to group the values by, or None for all.
+        """
+        super().__init__(cfg)
+        self._levels = levels
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._mapping._level_keys(self._levels))
+
+    def __contains__(self, value: object) -> bool:  # noqa: D105
+        return any(v is value or v == value for v in self)
+
+    def __iter__(self) -> Iterator[Any]:  # noqa: D105
+        cfg = self._mapping
+        return (cfg._get_subset(k) for k in cfg._level_keys(self._levels))
+
+    def __reversed__(self) -> Iterator[Any]:  # noqa: D105
+        cfg = self._mapping
+        return (cfg._get_subset(k) for k in reversed(cfg._level_keys(self._levels)))
+
+    def __repr__(self) -> str:  # noqa: D105
+        return "%s(%r)" % (type(self).__name__, list(self))
+
+
+class ConfigurationItemsView(ItemsView[str, Any]):
+    """Lazy view on the items of a configuration, grouped by a number of levels."""
+
+    __slots__ = ("_levels",)
+
+    _mapping: Configuration
+
+    def __init__(self, cfg: Configuration, levels: Optional[int]):
+        """Class Constructor.
+
+        Params:
+            cfg: configuration to create the view from.
+            levels: number of levels to group the items by, or None for all.
+        """
+        super().__init__(cfg)  # type: ignore [arg-type]
+        self._levels = levels
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._mapping._level_keys(self._levels))
+
+    def __contains__(self, item: object) -> bool:  # noqa: D105
+        if not isinstance(item, tuple) or len(item) != 2:
+            return False
+        key, value = item
+        cfg = self._mapping
+        if not cfg._has_level_key(key, self._levels):
+            return False
+        v = cfg._get_subset(key)
+        return v is value or v == value
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:  # noqa: D105
+        cfg = self._mapping
+        return ((k, cfg._get_subset(k)) for k in cfg._level_keys(self._levels))
+
+    def __reversed__(self) -> Iterator[Tuple[str, Any]]:  # noqa: D105
+        cfg = self._mapping
+        return (
+            (k, cfg._get_subset(k)) for k in reversed(cfg._level_keys(self._levels))
+        )
+
+    def __repr__(self) -> str:  # noqa: D105
+        return "%s(%r)" % (type(self).__name__, list(self))
+
+
+def _hashable(value: Any) -> Any:
+    """Return a hashable equivalent of a configuration value."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_hashable(v) for v in value)
+    if isinstance(value, Mapping):
+        return frozenset((k, _hashable(v)) for k, v in value.items())
+    return value
+
+
+def _item_hash(key: str, value: Any) -> int:
+    return hash((key, _hashable(value)))
+
+
+class FrozenConfiguration(Configuration):
+    """Immutable [Configuration][config.configuration.Configuration].
+
+    The values are kept in a [PersistentMap][config.helpers.PersistentMap], so
+    that `set` and `update` return new versions sharing the unchanged parts
+    of the previous one in O(log n) per key. Lookups read the map directly,
+    and the key index of a new version is derived from the one of the
+    previous version, so that no version is ever copied. Frozen configurations are
+    hashable as long as their values are (lists, sets and mappings are
+    compared by content), and can be shared across threads without locks.
+    """
+
+    _flat: Optional[Dict[str, Any]] = None
+    _hash: Optional[int] = None
+
+    def __init__(
+        self,
+        config_: Mapping[str, Any],
+        lowercase_keys: bool = False,
+        interpolate: InterpolateType = False,
+        interpolate_type: InterpolateEnumType = InterpolateEnumType.STANDARD,
+    ):
+        """Class Constructor.
+
+        Params:
+            config_: a mapping of configuration values. Keys need to be strings.
+            lowercase_keys: whether to convert every key to lower case.
+            interpolate: whether to apply string interpolation when looking for items.
+            interpolate_type: interpolation method.
+        """  # noqa: E501
+        self._lowercase = lowercase_keys
+        self._interpolate = {} if interpolate is True else interpolate
+        self._interpolate_type = interpolate_type
+        self._default_levels = 1
+        self._map = PersistentMap(self._flatten_dict(config_))
+        # the map stands for the flat dictionary in lookups
+        self._contents = _Contents(cast(Dict[str, Any], self._map), next(_generations))
+
+    def _evolve(self, flat: Mapping[str, Any]) -> "FrozenConfiguration":
+        """Return a new version with the flat items of `flat` added."""
+        h = self._hash
+        if h is not None:
+            try:
+                for k, v in flat.items():
+                    if k in self._map:
+                        h ^= _item_hash(k, self._map[k])
+                    h ^= _item_hash(k, v)
+            except TypeError:  # unhashable value, raised when hashing instead
+                h = None
+        new = FrozenConfiguration.__new__(type(self))
+        new._lowercase = self._lowercase
+        new._interpolate = self._interpolate
+        new._interpolate_type = self._interpolate_type
+        new._default_levels = 1
+        new._map = self._map.update(flat)
+        index = cast(_Contents, self._contents).index
+        if index is not None:
+            # the index is shared with this version, except for the new keys
+            index = index.copy()
+            for k in flat:
+                index.add(k)
+        new._contents = _Contents(
+            cast(Dict[str, Any], new._map),
+            next(_generations),
+            index,
+        )
+        new._hash = h
+        return new
+
+    @property  # type: ignore[misc]
+    def _config(self) -> Dict[str, Any]:
+        # only built for operations on the whole dictionary
+        if self._flat is None:
+            self._flat = dict(self._map.items())
+        return self._flat
+
+    def _storage(self) -> Tuple[Dict[str, Any], KeyTrie, str]:
+        contents = cast(_Contents, self._contents)
+        if contents.index is None:
+            contents.index = KeyTrie(self._map)
+        return contents.config, contents.index, ""
+
+    def _register_view(self, view: "ConfigurationView") -> Configuration:
+        # nothing to detach, since the storage is never written to
+        return self
+
+    def _prepare_write(self) -> None:
+        raise TypeError("%s is immutable" % type(self).__name__)
+
+    def __hash__(self) -> int:  # noqa: D105
+        if self._hash is None:
+            h = 0
+            for k, v in self._map.items():
+                h ^= _item_hash(k, v)
+            self._hash = h
+        return self._hash
+
+    def __eq__(self, other):  # type: ignore
+        """Equality operator."""
+        if isinstance(other, FrozenConfiguration) and other._map is self._map:
+            return True
+        return super().__eq__(other)
+
+    def __setitem__(self, key: str, value: Any) -> None:  # noqa: D105
+        self._prepare_write()
+
+    def as_dict(self) -> dict:
+        """Return the representation as a dictionary."""
+        return dict(self._config)
+
+    def copy(self) -> "FrozenConfiguration":
+        """Return the instance itself, which is immutable."""
+        return self
+
+    def freeze(self) -> "FrozenConfiguration":
+        """Return the instance itself, which is already immutable."""
+        return self
+
+    def thaw(self) -> Configuration:
+        """Return a mutable copy of the configuration."""
+        return Configuration.from_flat(
+            dict(self._config),
+            lowercase_keys=self._lowercase,
+            interpolate=self._interpolate,
+            interpolate_type=self._interpolate_type,
+        )
+
+    def set(self, key: str, value: Any) -> "FrozenConfiguration":  # noqa: A003
+        """Return a new version of the configuration with `key` set to `value`."""
+        return self._evolve(self._flatten_dict({key: value}))
+
+    def update(self, other: Mapping[str, Any]) -> "FrozenConfiguration":  # type: ignore
+        """Return a new version of the configuration updated with `other`."""
+        return self._evolve(self._flatten_dict(other))
+
+
+class Accessor:
+    """Handle on a single key of a [Configuration][config.configuration.Configuration].
+
+    The resolved (and converted) value is kept until the generation of the
+    configuration changes, so repeated reads cost O(1). Note that the same
+    object is returned on every read until then.
+    """  # noqa: E501
+
+    __slots__ = ("_cfg", "_key", "_type", "_generation", "_value")
+
+    def __init__(
+        self,
+        cfg: Configuration,
+        key: str,
+        type: Optional[Callable[[Any], Any]] = None,  # noqa: A002
+    ):
+        """Class Constructor.
+
+        Params:
+            cfg: configuration to read from.
+            key: key to read.
+            type: optional conversion to apply to the value.
+        """
+        self._cfg = cfg
+        self._key = key
+        self._type = type
+        self._generation: Optional[Any] = None
+        self._value: Any = None
+
+    def get(self) -> Any:
+        """Return the current value of the key."""
+        generation = self._cfg._generation
+        if generation is None or generation != self._generation:
+            value = self._cfg[self._key]
+            if self._type is not None:
+                value = self._type(value)
+            self._value = value
+            self._generation = generation
+        return self._value
+
+    __call__ = get
+
+    def __repr__(self) -> str:  # noqa: D105
+        return "<Accessor: %r>" % self._key
@@ -1,20 +1,175 @@
 """ConfigurationSet class."""
 
 import contextlib
+import operator
+import threading
+from collections import ChainMap
+from concurrent.futures import Executor, ThreadPoolExecutor
+from copy import copy
 from typing import (
+    AbstractSet,
     Any,
-    ItemsView,
+    Dict,
     Iterable,
-    KeysView,
     List,
     Mapping,
     Optional,
+    Set,
+    Tuple,
     Union,
-    ValuesView,
+    cast,
 )
 
-from .configuration import Configuration
-from .helpers import InterpolateEnumType, InterpolateType, clean, interpolate_object
+from .configuration import _MISSING, Configuration, FrozenConfiguration, _Contents
+from .helpers import (
+    InterpolateEnumType,
+    InterpolateType,
+    KeyTrie,
+    LoadError,
+    clean,
+    interpolate_all,
+    interpolate_object,
+)
+
+
+class _MergeState:
+    """Merged contents of the layers of a ConfigurationSet, at given generations."""
+
+    __slots__ = ("layers", "generations", "merged", "owners", "owned", "holders")
+
+    def __init__(self, layers: List[Configuration]) -> None:  # noqa: D107
+        self.layers = list(layers)
+        self.generations = tuple(cfg._generation for cfg in layers)
+        merged: Dict[str, Any] = {}
+        # index of the layer each key is read from, and the keys read from each layer
+        self.owners: Dict[str, int] = {}
+        self.owned: List[Set[str]] = [set() for _ in layers]
+        for i in range(len(layers) - 1, -1, -1):
+            d = layers[i]._read_config()
+            merged.update(d)
+            self.owners.update(dict.fromkeys(d, i))
+        for k, i in self.owners.items():
+            self.owned[i].add(k)
+        self.merged = Configuration.from_flat(merged)
+        # layers holding each key or prefix looked up, at the generations checked
+        self.holders: Dict[str, Tuple[Tuple[Any, ...], Tuple[int, ...]]] = {}
+
+    def matches(self, layers: List[Configuration]) -> bool:
+        """Check whether the state was built from the same layer objects."""
+        return len(layers) == len(self.layers) and all(
+            map(operator.is_, layers, self.layers),
+        )
+
+    def refresh(
+        self,
+        layers: List[Configuration],
+        generations: Tuple[Any, ...],
+    ) -> "_MergeState":
+        """Return the state with the layers whose generation changed merged again.
+
+        The state itself is left untouched, so that readers holding it keep
+        seeing consistent contents: the new state is built off to the side,
+        sharing the key index of the unaffected keys with this one.
+
+        Params:
+            layers: layers to merge, standing for the layers of the state at
+                the same positions.
+            generations: current generations of the layers.
+        """
+        changed = [
+            i for i, (a, b) in enumerate(zip(generations, self.generations)) if a != b
+        ]
+        if not changed and self.matches(layers):
+            return self
+        layers = list(layers)
+        dicts = [cfg._read_config() for cfg in layers]
+        affected: Set[str] = set()
+        for i in changed:
+            affected.update(self.owned[i])
+            # keys still shadowed by an unchanged layer above keep their value
+            keys: AbstractSet[str] = dicts[i].keys()
+            for j in range(i):
+                if j not in changed:
+                    keys = keys - self.owned[j]
+            affected.update(keys)
+        state = _MergeState.__new__(_MergeState)
+        state.layers = layers
+        state.generations = generations
+        # the cached holders are checked against the generations of the layers
+        state.holders = self.holders
+        if not changed:
+            state.owners, state.owned, state.merged = (
+                self.owners,
+                self.owned,
+                self.merged,
+            )
+            return state
+        previous, trie = self.merged._key_index()
+        merged = dict(previous)
+        trie = trie.copy()
+        owners = dict(self.owners)
+        owned = list(self.owned)
+        copied: Set[int] = set()
+
+        def own(i: int) -> Set[str]:
+            if i not in copied:
+                owned[i] = set(owned[i])
+                copied.add(i)
+            return owned[i]
+
+        for k in affected:
+            owner = next((i for i, d in enumerate(dicts) if k in d), None)
+            current = owners.get(k)
+            if owner != current:
+                if current is not None:
+                    own(current).discard(k)
+                if owner is None:
+                    del owners[k]
+                    del merged[k]
+                    trie.discard(k)
+                    continue
+                owners[k] = owner
+                own(owner).add(k)
+            if k not in merged:
+                trie.add(k)
+            merged[k] = dicts[cast(int, owner)][k]
+        state.owners = owners
+        state.owned = owned
+        state.merged = Configuration.from_flat(merged)
+        cast(_Contents, state.merged._contents).index = trie
+        return state
+
+    def layers_with(self, item: str) -> Tuple[int, ...]:
+        """Return the indices of the layers holding `item`, in priority order.
+
+        Only the layers that changed since `item` was last looked up are
+        checked again.
+        """
+        generations = self.generations
+        entry = self.holders.get(item)
+        if entry is None:
+            check: Iterable[int] = range(len(self.layers))
+            held: Set[int] = set()
+        elif entry[0] == generations:
+            return entry[1]
+        else:
+            check = [i for i, g in enumerate(entry[0]) if g != generations[i]]
+            held = set(entry[1])
+        for i in check:
+            if item in self.layers[i]:
+                held.add(i)
+            else:
+                held.discard(i)
+        result = tuple(sorted(held))
+        if result:
+            self.holders[item] = (generations, result)
+        elif entry is not None:
+            del self.holders[item]
+        return result
+
+
+# held while the reloads of sets loaded in parallel are published
+_publishing = threading.Lock()
 
 
 class ConfigurationSet(Configuration):
@@ -24,6 +179,11 @@ class ConfigurationSet(Configuration):
     instances in a hierarchical manner.
     """
 
+    # merge state read instead of the layers while a reload is being published
+    _pinned: Optional[_MergeState] = None
+    # number of reloads published, for readers to detect they read during one
+    _epoch = 0
+
     def __init__(
         self,
         *configs: Configuration,
@@ -51,6 +211,10 @@ class ConfigurationSet(Configuration):
             )
         self._writable = False
         self._default_levels = 1
+        self._merge_state: Optional[_MergeState] = None
+        self._interpolation_cache: Optional[
+            Tuple[Tuple[Any, ...], List[Mapping[str, Any]]]
+        ] = None
 
     def _from_configs(self, attr: str, *args: Any, **kwargs: dict) -> Any:
         last_err = Exception()
@@ -64,10 +228,14 @@ class ConfigurationSet(Configuration):
         if not values:
             # raise the last error
             raise last_err
+        return self._merge_values(args[0], values)
+
+    def _merge_values(self, item: str, values: List[Any]) -> Any:
+        """Combine the values of `item` found in the layers, in priority order."""
         if all(isinstance(v, Configuration) for v in values):
             result: dict = {}
             for v in values[::-1]:
-                result.update(v.as_dict())
+                result.update(v._read_config())
             return Configuration(result)
         elif isinstance(values[0], Configuration):
             result = {}
@@ -77,12 +245,37 @@ class ConfigurationSet(Configuration):
                 result.update(v)
             return Configuration(result)
         elif self._interpolate is not False:
-            d = [d.as_dict() for d in self._configs]
-            d[0].update(self._interpolate)
-            return interpolate_object(args[0], values[0], d, self._interpolate_type)
+            method = self._interpolate_type
+            d = self._interpolation_dicts(flat=method == InterpolateEnumType.STANDARD)
+            return interpolate_object(item, values[0], d, method)
         else:
             return values[0]
 
+    def _interpolation_dicts(self, flat: bool = False) -> List[Mapping[str, Any]]:
+        """Return the dictionaries to read interpolation variables from.
+
+        The interpolation variables are an overlay over the first layer, which
+        is left untouched. The list is reused until a layer changes.
+
+        Params:
+            flat: return the merged contents of the layers as a single mapping.
+        """
+        generations = self._generation
+        if flat and generations is not None:
+            merged = self._merged_view()._config
+            return [ChainMap(cast(dict, self._interpolate), merged)]
+        cached = self._interpolation_cache
+        if generations is not None and cached is not None and cached[0] == generations:
+            return cached[1]
+        layers = [cfg._read_config() for cfg in self._configs]
+        d: List[Mapping[str, Any]] = [
+            ChainMap(cast(dict, self._interpolate), layers[0]),
+            *layers[1:],
+        ]
+        if generations is not None:
+            self._interpolation_cache = (generations, d)
+        return d
+
     def _writable_config(self) -> Configuration:
         if not self._writable:
             lowercase = bool(self._configs and self._configs[0]._lowercase)
@@ -90,6 +283,15 @@ class ConfigurationSet(Configuration):
             self._writable = True
         return self._configs[0]
 
+    @property  # type: ignore[misc]
+    def _generation(self) -> Optional[Tuple[Any, ...]]:  # type: ignore
+        """Generations of the underlying configurations, None if any is untracked."""
+        pinned = self._pinned
+        if pinned is not None:
+            return pinned.generations
+        generations = tuple(cfg._generation for cfg in self._configs)
+        return None if None in generations else generations
+
     @property
     def configs(self) -> List[Configuration]:
         """List of underlying configuration objects."""
@@ -105,11 +307,62 @@ class ConfigurationSet(Configuration):
         else:
             self._configs = list(iterable)
 
+    def _lookup(self, item: str, default: Any) -> Any:
+        state, value = self._lookup_state(item)
+        if state is None:
+            # layers that cannot track their changes are all looked up
+            values = []
+            for cfg in self._configs:
+                with contextlib.suppress(Exception):
+                    values.append(cfg[item])
+            return self._merge_values(item, values) if values else default
+        return default if value is _MISSING else value
+
+    def _lookup_state(self, item: str) -> Tuple[Optional[_MergeState], Any]:
+        """Look up `item` in the layers, never mixing layers from before and after a reload.
+
+        Returns:
+            the merge state the value was read from, None if some layers cannot
+            track their changes, and the value or `_MISSING`.
+        """  # noqa: E501
+        while True:
+            epoch = self._epoch
+            state = self._state()
+            if state is None:
+                return None, _MISSING
+            value = self._lookup_layers(state, item, _MISSING)
+            # read again if a reload was published meanwhile
+            if self._epoch == epoch:
+                return state, value
+
+    def _lookup_layers(self, state: _MergeState, item: str, default: Any) -> Any:
+        """Look up `item` in the layers holding it according to the merge state."""
+        # go straight to the highest layer holding the item, and only read the
+        # lower ones when the values have to be merged
+        layers = state.layers
+        holders = state.layers_with(item)
+        if not holders:
+            return default
+        values = [layers[holders[0]][item]]
+        if isinstance(values[0], Configuration):
+            values.extend(layers[i][item] for i in holders[1:])
+        return self._merge_values(item, values)
+
     def __getitem__(self, item: str) -> Union[Configuration, Any]:  # noqa: D105
-        return self._from_configs("__getitem__", item)
+        state, value = self._lookup_state(item)
+        if state is None:
+            return self._from_configs("__getitem__", item)
+        if value is _MISSING:
+            raise KeyError(item)
+        return value
 
     def __getattr__(self, item: str) -> Union[Configuration, Any]:  # noqa: D105
-        return self._from_configs("__getattr__", item)
+        state, value = self._lookup_state(item)
+        if state is None:
+            return self._from_configs("__getattr__", item)
+        if value is _MISSING:
+            raise AttributeError(item)
+        return value
 
     def get(self, key: str, default: Any = None) -> Union[dict, Any]:
         """Get the configuration values corresponding to `key`.
@@ -126,13 +379,111 @@ class ConfigurationSet(Configuration):
         except Exception:
             return default
 
-    def as_dict(self) -> dict:
-        """Return the representation as a dictionary."""
+    def get_many(self, keys: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        """Get the configuration values corresponding to several keys at once.
+
+        Each underlying configuration is looked up once for all the keys.
+
+        Params:
+            keys: keys to retrieve.
+            default: default value for the missing keys.
+
+        Returns:
+            a dictionary with the value of each key, as returned by item
+            access, or the default.
+        """
+        keys = list(keys)
+        while True:
+            epoch = self._epoch
+            found = self._get_many_layers(keys)
+            # read again if a reload was published meanwhile
+            if self._epoch == epoch:
+                break
         result = {}
-        for config_ in self._configs[::-1]:
-            result.update(config_.as_dict())
+        for key, values in found.items():
+            try:
+                result[key] = self._merge_values(key, values) if values else default
+            except Exception:
+                result[key] = default
         return result
 
+    def _get_many_layers(self, keys: List[str]) -> Dict[str, List[Any]]:
+        """Return the values of each key found in the layers, in priority order."""
+        state = self._state()
+        found: Dict[str, List[Any]] = {key: [] for key in keys}
+        for cfg in self._configs if state is None else state.layers:
+            try:
+                layer = cfg.get_many(found, _MISSING)
+            except Exception:
+                # fall back to the keys one by one, skipping the failures
+                layer = {}
+                for key in found:
+                    with contextlib.suppress(Exception):
+                        layer[key] = cfg[key]
+            for key, value in layer.items():
+                if value is not _MISSING:
+                    found[key].append(value)
+        return found
+
+    def _state(self) -> Optional[_MergeState]:
+        """Return the merge state of the layers, brought up to date.
+
+        The merge is cached and, when some layers change, only the keys of
+        those layers are merged again. Returns None when some layers cannot
+        track their changes. While a reload loaded in parallel is being
+        published, the state of the new contents of every layer is returned.
+        """
+        while True:
+            epoch = self._epoch
+            pinned = self._pinned
+            if pinned is not None:
+                return pinned
+            layers = self._configs
+            generations = tuple(cfg._generation for cfg in layers)
+            if None in generations:
+                self._merge_state = None
+                return None
+            # the state is replaced with a single assignment, never changed in place
+            state = self._merge_state
+            if state is None or not state.matches(layers):
+                state = self._merge_state = _MergeState(layers)
+            elif state.generations != generations:
+                state = self._merge_state = state.refresh(layers, generations)
+            # merge again if a reload was published meanwhile
+            if self._epoch == epoch:
+                return state
+
+    def _merged_view(self) -> Configuration:
+        """Return a configuration with the merged contents of the layers.
+
+        Layers that cannot track their changes are merged on every call.
+        """
+        state = self._state() or _MergeState(self._configs)
+        return state.merged
+
+    @property  # type: ignore[misc]
+    def _config(self) -> Dict[str, Any]:
+        """Merged contents of the layers, which must not be modified."""
+        return self._merged_view()._config
+
+    def as_dict(self) -> dict:
+        """Return the representation as a dictionary."""
+        return dict(self._merged_view()._config)
+
+    def resolve(self) -> Configuration:
+        """Return a snapshot of the merged configurations with every value interpolated.
+
+        The interpolation variables are resolved once each, in dependency order,
+        instead of every time a value is read.
+        """  # noqa: E501
+        config_ = self.as_dict()
+        if self._interpolate is False:
+            return Configuration.from_flat(config_)
+        d = self._interpolation_dicts()
+        return Configuration.from_flat(
+            interpolate_all(config_, d, self._interpolate_type),
+        )
+
     def get_dict(self, item: str) -> dict:
         """Get the item values as a dictionary.
 
@@ -140,35 +491,8 @@ class ConfigurationSet(Configuration):
         """
         return Configuration(dict(dict(self[item]).items())).as_dict()
 
-    def keys(
-        self,
-        levels: Optional[int] = None,
-    ) -> Union["Configuration", Any, KeysView[str]]:
-        """Return a set-like object providing a view on the configuration keys."""
-        if self._default_levels:
-            return Configuration(self.as_dict()).keys(levels or self._default_levels)
-        with Configuration(self.as_dict()).dotted_iter() as cfg:
-            return cfg.keys(levels)
-
-    def values(
-        self,
-        levels: Optional[int] = None,
-    ) -> Union["Configuration", Any, ValuesView[Any]]:
-        """Return a set-like object providing a view on the configuration values."""
-        if self._default_levels:
-            return Configuration(self.as_dict()).values(levels or self._default_levels)
-        with Configuration(self.as_dict()).dotted_iter() as cfg:
-            return cfg.values(levels)
-
-    def items(
-        self,
-        levels: Optional[int] = None,
-    ) -> Union["Configuration", Any, ItemsView[str, Any]]:
-        """Return a set-like object providing a view on the configuration items."""
-        if self._default_levels:
-            return Configuration(self.as_dict()).items(levels or self._default_levels)
-        with Configuration(self.as_dict()).dotted_iter() as cfg:
-            return cfg.items(levels)
+    def _storage(self) -> Tuple[Dict[str, Any], KeyTrie, str]:
+        return self._merged_view()._storage()
 
     def __setitem__(self, key: str, value: Any) -> None:  # noqa: D105
         cfg = self._writable_config()
@@ -186,7 +510,14 @@ class ConfigurationSet(Configuration):
             raise KeyError()
 
     def __contains__(self, prefix: str) -> bool:  # noqa: D105
-        return any(prefix in cfg for cfg in self._configs)
+        while True:
+            epoch = self._epoch
+            state = self._state()
+            layers = self._configs if state is None else state.layers
+            found = any(prefix in cfg for cfg in layers)
+            # look again if a reload was published meanwhile
+            if self._epoch == epoch:
+                return found
 
     def clear(self) -> None:
         """Remove all items."""
@@ -194,19 +525,212 @@ class ConfigurationSet(Configuration):
             cfg.clear()
 
     def copy(self) -> "Configuration":
-        """Return shallow copy."""
-        return ConfigurationSet(*self._configs)
+        """Return shallow copy, with copies of the underlying configurations.
+
+        The copies keep the class of the configurations, so that e.g. file
+        configurations can still be reloaded, and share their storage until
+        either side is written to.
+        """
+        new = ConfigurationSet(
+            *(cfg._clone() for cfg in self._configs),
+            interpolate=self._interpolate,
+            interpolate_type=self._interpolate_type,
+        )
+        new._writable = self._writable
+        return new
+
+    def freeze(self) -> FrozenConfiguration:
+        """Return an immutable and hashable snapshot of the merged configuration."""
+        return FrozenConfiguration(
+            self.as_dict(),
+            lowercase_keys=bool(self._configs and self._configs[0]._lowercase),
+            interpolate=self._interpolate,
+            interpolate_type=self._interpolate_type,
+        )
+
+    def compact(self) -> None:
+        """Reduce the memory used by the keys of the underlying configurations."""
+        for cfg in self._configs:
+            cfg.compact()
+
+    def _memory_usage(self, seen: Set[int]) -> Dict[str, int]:
+        report = dict.fromkeys(("table", "keys", "values", "index", "total"), 0)
+        for cfg in self._configs:
+            for k, v in cfg._memory_usage(seen).items():
+                report[k] += v
+        return report
 
     def update(self, other: Mapping[str, Any]) -> None:
         """Update the ConfigurationSet with another Configuration object or Mapping."""
         cfg = self._writable_config()
         cfg.update(other)
 
-    def reload(self) -> None:
-        """Reload the underlying configuration instances."""
-        for cfg in self._configs:
-            with contextlib.suppress(NotImplementedError):
-                cfg.reload()
+    def reload(self, parallel: bool = False, max_workers: Optional[int] = None) -> bool:
+        """Reload the underlying configuration instances.
+
+        Params:
+            parallel: whether to load the configurations on a thread pool,
+                including the configurations of nested sets. The new contents
+                are only published once every configuration has been loaded,
+                and none are if any of them fails. Readers of the set see
+                either the old or the new contents of every configuration.
+                Configurations fetching their values lazily (e.g. from secret
+                stores) drop the values they fetched while the others are
+                loaded.
+            max_workers: maximum number of threads when reloading in parallel.
+
+        Returns:
+            whether the contents of any configuration changed.
+
+        Raises:
+            LoadError: when reloading in parallel, if some configurations failed,
+                with the error of each of them.
+        """
+        changed = False
+        if not parallel:
+            for cfg in self._configs:
+                with contextlib.suppress(NotImplementedError):
+                    changed = cfg.reload() or changed
+            return changed
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            jobs = self._submit_loads(executor)
+        loaded = self._loaded(jobs)
+        with _publishing:
+            leaves: List[Tuple[Configuration, Any, bool]] = []
+            pins: List[Tuple[ConfigurationSet, List[Configuration], _MergeState]] = []
+            changed = self._stage(loaded, leaves, pins)[1]
+            # readers of the sets read the new contents from copies of the
+            # layers while the layers themselves are updated
+            for cfgs, _, state in pins:
+                cfgs._pinned = state
+                cfgs._epoch += 1
+            for cfg, contents, layer_changed in leaves:
+                cfg._publish_contents(contents, layer_changed)
+            for cfgs, layers, state in pins:
+                cfgs._merge_state = state.refresh(layers, state.generations)
+                cfgs._pinned = None
+        return changed
+
+    def _submit_loads(self, executor: Executor) -> List[Tuple[Configuration, Any]]:
+        """Start loading the layers, including the layers of nested sets.
+
+        Returns:
+            each layer along with the future of its loaded contents, or with
+            the loads of its own layers for nested sets.
+        """
+        return [
+            (
+                cfg,
+                cfg._submit_loads(executor)
+                if isinstance(cfg, ConfigurationSet)
+                else executor.submit(self._load_layer, cfg),
+            )
+            for cfg in self._configs
+        ]
+
+    @staticmethod
+    def _load_layer(cfg: Configuration) -> Any:
+        """Load a layer without publishing its contents.
+
+        Returns:
+            the arguments to publish the contents with `_replace_config`, None
+            if the layer did not change or, for layers that can only be
+            reloaded in place, whether they changed.
+        """
+        with contextlib.suppress(NotImplementedError):
+            return cfg._load()
+        try:
+            return cfg.reload()
+        except NotImplementedError:
+            return False
+
+    @staticmethod
+    def _loaded(
+        jobs: List[Tuple[Configuration, Any]],
+    ) -> List[Tuple[Configuration, Any]]:
+        """Wait for the loads started by `_submit_loads`.
+
+        Raises:
+            LoadError: with the error of each layer that failed to load, which
+                is itself a LoadError for nested sets.
+        """
+        results = []
+        errors: Dict[int, Exception] = {}
+        for i, (cfg, job) in enumerate(jobs):
+            try:
+                result = (
+                    ConfigurationSet._loaded(job)
+                    if isinstance(job, list)
+                    else job.result()
+                )
+            except Exception as err:
+                errors[i] = err
+                continue
+            results.append((cfg, result))
+        if errors:
+            raise LoadError(errors)
+        return results
+
+    def _stage(
+        self,
+        loaded: List[Tuple[Configuration, Any]],
+        leaves: List[Tuple[Configuration, Any, bool]],
+        pins: List[Tuple["ConfigurationSet", List[Configuration], _MergeState]],
+    ) -> Tuple["ConfigurationSet", bool]:
+        """Build the new contents of the layers loaded by `_submit_loads`.
+
+        Params:
+            loaded: the layers along with their loaded contents.
+            leaves: list to add the layers to update to, along with their new
+                contents and whether they changed.
+            pins: list to add the sets to update to, along with their layers
+                and the merge state of their new contents.
+
+        Returns:
+            a copy of the set reading from copies of the layers holding the new
+            contents, and whether any layer changed.
+        """
+        changed = False
+        layers = [cfg for cfg, _ in loaded]
+        staged: List[Configuration] = []
+        layer: Configuration
+        for cfg, result in loaded:
+            if isinstance(result, list):
+                layer, layer_changed = cast(ConfigurationSet, cfg)._stage(
+                    result,
+                    leaves,
+                    pins,
+                )
+            elif isinstance(result, tuple):
+                new = cfg._stage_config(*result)
+                layer, layer_changed = cfg, False
+                if new is not None:
+                    layer = copy(cfg)
+                    layer._contents, layer_changed = new
+                    leaves.append((cfg, *new))
+            else:
+                layer, layer_changed = cfg, bool(result)
+            staged.append(layer)
+            changed = layer_changed or changed
+        clone = copy(self)
+        clone._configs = staged
+        clone._merge_state = clone._pinned = clone._interpolation_cache = None
+        generations = tuple(cfg._generation for cfg in staged)
+        current = self._configs
+        # sets whose layers were replaced meanwhile read the layers themselves
+        if (
+            None not in generations
+            and len(current) == len(layers)
+            and all(map(operator.is_, current, layers))
+        ):
+            state = self._merge_state
+            if state is not None and state.matches(layers):
+                clone._merge_state = state.refresh(staged, generations)
+            else:
+                clone._merge_state = _MergeState(staged)
+            pins.append((self, layers, clone._merge_state))
+        return clone, changed
 
     def __repr__(self) -> str:  # noqa: D105
         return "<ConfigurationSet: %s>" % hex(id(self))
@@ -63,7 +63,7 @@ class AWSSecretsManagerConfiguration(Configuration):
         self._interpolate = {} if interpolate is True else interpolate
         self._default_levels = None
 
-    @property
+    @property  # type: ignore[misc]
     def _config(self) -> Dict[str, Any]:  # type: ignore
         now = time.time()
         if self._secret.ts + self._expiration > now:
@@ -107,9 +107,14 @@ class AWSSecretsManagerConfiguration(Configuration):
             self._secret = Cache(json.loads(secret), now)
             return self._secret.value
 
-    def reload(self) -> None:
-        """Reload the configuration."""
+    def reload(self) -> bool:
+        """Reload the configuration.
+
+        Returns:
+            always True, as the values are fetched again when used.
+        """
         self._secret = Cache({}, 0)
+        return True
 
     def __repr__(self) -> str:  # noqa: D105
         return "<AWSSecretsManagerConfiguration: %r>" % self._secret_name
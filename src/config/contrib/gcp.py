@@ -1,7 +1,17 @@
 """Configuration instances from GCP Secret Manager."""
 
 import time
-from typing import Any, Dict, ItemsView, KeysView, Optional, Union, ValuesView, cast
+from typing import (
+    Any,
+    Dict,
+    ItemsView,
+    Iterable,
+    KeysView,
+    Optional,
+    Union,
+    ValuesView,
+    cast,
+)
 
 from google.api_core.client_options import ClientOptions
 from google.api_core.exceptions import NotFound
@@ -85,6 +95,22 @@ class GCPSecretManagerConfiguration(Configuration):
         else:
             return secret
 
+    def __contains__(self, prefix: str) -> bool:  # noqa: D105
+        return self._get_secret(prefix) is not None
+
+    def get_many(self, keys: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        """Get the secrets corresponding to several keys at once.
+
+        Params:
+            keys: keys to retrieve.
+            default: default value for the missing keys.
+        """
+        result = {}
+        for key in keys:
+            secret = self._get_secret(key)
+            result[key] = default if secret is None else secret
+        return result
+
     def __getattr__(self, item: str) -> Any:  # noqa: D105
         secret = self._get_secret(item)
         if secret is None:
@@ -150,13 +176,18 @@ class GCPSecretManagerConfiguration(Configuration):
             ),
         )
 
-    def reload(self) -> None:
-        """Reload the configuration."""
+    def reload(self) -> bool:
+        """Reload the configuration.
+
+        Returns:
+            always True, as the values are fetched again when used.
+        """
         self._cache.clear()
+        return True
 
     def __repr__(self) -> str:  # noqa: D105
         return "<GCPSecretManagerConfiguration: %r>" % self._project_id
 
-    @property
-    def _config(self) -> Dict[str, Any]:  # type: ignore
+    @property  # type: ignore[misc]
+    def _config(self) -> Dict[str, Any]:
         return dict(self.items())
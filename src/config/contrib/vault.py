@@ -5,6 +5,7 @@ from typing import (
     Any,
     Dict,
     ItemsView,
+    Iterable,
     KeysView,
     Mapping,
     Optional,
@@ -86,6 +87,28 @@ class HashicorpVaultConfiguration(Configuration):
                 Configuration(secret)[".".join(rest)] if rest else Configuration(secret)
             )
 
+    def __contains__(self, prefix: str) -> bool:  # noqa: D105
+        path, *rest = prefix.split(".", 1)
+        secret = self._get_secret(path)
+        if secret is None:
+            return False
+        return ".".join(rest) in Configuration(secret) if rest else True
+
+    def get_many(self, keys: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        """Get the values corresponding to several keys at once.
+
+        Params:
+            keys: keys to retrieve.
+            default: default value for the missing keys.
+        """
+        result = {}
+        for key in keys:
+            try:
+                result[key] = self[key]
+            except KeyError:
+                result[key] = default
+        return result
+
     def __getattr__(self, item: str) -> Any:  # noqa: D105
         secret = self._get_secret(item)
         if secret is None:
@@ -147,13 +170,18 @@ class HashicorpVaultConfiguration(Configuration):
             ),
         )
 
-    def reload(self) -> None:
-        """Reload the configuration."""
+    def reload(self) -> bool:
+        """Reload the configuration.
+
+        Returns:
+            always True, as the values are fetched again when used.
+        """
         self._cache.clear()
+        return True
 
     def __repr__(self) -> str:  # noqa: D105
         return "<HashicorpVaultConfiguration: %r>" % self._engine
 
-    @property
-    def _config(self) -> Dict[str, Any]:  # type: ignore
+    @property  # type: ignore[misc]
+    def _config(self) -> Dict[str, Any]:
         return config_from_dict(dict(self.items()))._config
@@ -0,0 +1,88 @@
+"""Helpers to detect changes to files and to cache their parsed contents."""
+
+import contextlib
+import marshal
+import os
+import pickle
+import struct
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple, Union, cast
+
+# files modified more recently than this when read may change again without their
+# modification time changing, given the resolution of the filesystem timestamps
+RACY_NANOSECONDS = 1_000_000_000
+
+
+def file_signature(
+    path: Union[str, "os.PathLike[str]"],
+) -> Optional[Tuple[int, int, int]]:
+    """Return the inode, size and modification time of a file.
+
+    Returns:
+        the signature, or None if the file was modified too recently for it to
+        tell whether the file changes again.
+    """
+    now = time.time_ns()
+    stat = os.stat(path)
+    if now - stat.st_mtime_ns < RACY_NANOSECONDS:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def dump_flat(d: Dict[str, Any]) -> bytes:
+    """Serialize a flat dictionary, e.g. to send it across processes.
+
+    Dictionaries of plain values (strings, numbers, lists, ...) are written
+    with `marshal`, which is more compact and faster to load, and the rest
+    with `pickle`.
+
+    Params:
+       d: flat dictionary
+    """
+    try:
+        return b"m" + marshal.dumps(d)
+    except ValueError:
+        return b"p" + pickle.dumps(d, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_flat(data: bytes) -> Dict[str, Any]:
+    """Deserialize a flat dictionary written by `dump_flat`.
+
+    Params:
+       data: serialized dictionary
+    """
+    body = memoryview(data)[1:]
+    if data[:1] == b"m":
+        return cast(Dict[str, Any], marshal.loads(body))
+    return cast(Dict[str, Any], pickle.loads(body))
+
+
+# size and modification time of a cached file, and the hash of its contents
+CACHE_HEADER = struct.Struct("<qq32s")
+
+
+def read_cache_entry(entry: str) -> Optional[Tuple[int, int, bytes, bytes]]:
+    """Return the header fields and the body of a cache entry, if it can be read."""
+    try:
+        with open(entry, "rb") as f:
+            header = f.read(CACHE_HEADER.size)
+            size, mtime, digest = CACHE_HEADER.unpack(header)
+            return size, mtime, digest, f.read()
+    except (OSError, struct.error):
+        return None
+
+
+def write_cache_entry(entry: str, header: Tuple[int, int, bytes], body: bytes) -> None:
+    """Write a cache entry atomically, ignoring the failures to do so."""
+    with contextlib.suppress(OSError):
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(entry))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(CACHE_HEADER.pack(*header))
+                f.write(body)
+            os.replace(tmp, entry)
+        except OSError:
+            os.unlink(tmp)
+            raise
@@ -1,8 +1,25 @@
 """Helper functions."""
 
 import string
+import sys
+from collections import ChainMap
 from enum import Enum
-from typing import Any, Dict, List, Set, Tuple, Union
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 TRUTH_TEXT = frozenset(("t", "true", "y", "yes", "on", "1"))
 FALSE_TEXT = frozenset(("f", "false", "n", "no", "off", "0", ""))
@@ -10,6 +27,9 @@ PROTECTED_KEYS = frozenset(("secret", "password", "passwd", "pwd", "token"))
 
 InterpolateType = Union[bool, Dict[str, str]]
 
+# maximum number of parsed interpolation templates to keep around
+TEMPLATE_CACHE_SIZE = 8192
+
 
 class InterpolateEnumType(Enum):
     """Interpolation Method."""
@@ -24,6 +44,21 @@ class InterpolateEnumType(Enum):
     DEEP_NO_BACKTRACK = 2
 
 
+class LoadError(Exception):
+    """Raised when some configurations could not be loaded or reloaded.
+
+    The `errors` attribute maps the position of each configuration that failed
+    to the exception it raised.
+    """
+
+    def __init__(self, errors: Mapping[int, Exception]):  # noqa: D107
+        self.errors = dict(errors)
+        super().__init__(
+            "Failed to load configurations: "
+            + ", ".join("%d (%r)" % (i, err) for i, err in sorted(self.errors.items())),
+        )
+
+
 class AttributeDict(dict):
     """Dictionary subclass enabling attribute lookup/assignment of keys/values."""
 
@@ -38,6 +73,508 @@ class AttributeDict(dict):
         self[key] = value
 
 
+def intern_key(key: Any) -> Any:
+    """Intern a string, so that equal keys share a single object in memory."""
+    return sys.intern(key) if type(key) is str else key
+
+
+def deep_sizeof(obj: Any, seen: Set[int]) -> int:
+    """Return the size in bytes of `obj` and of the containers nested in it.
+
+    Params:
+        obj: object to measure.
+        seen: ids of the objects already counted, which are skipped.
+    """
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+    return size
+
+
+class TrieNode:
+    """Node of a [KeyTrie][config.helpers.KeyTrie]."""
+
+    __slots__ = ("children", "key", "size", "owner")
+
+    def __init__(self, owner: Any = None) -> None:  # noqa: D107
+        # leaves share a read-only empty mapping until a child is added
+        self.children: Dict[str, "TrieNode"] = _NO_CHILDREN
+        # the full dotted key if this node holds a value
+        self.key: Optional[str] = None
+        # number of keys stored in this subtree
+        self.size = 0
+        # token of the trie allowed to modify the node in place
+        self.owner = owner
+
+    def __getstate__(self) -> Tuple[Any, ...]:  # noqa: D105
+        # the shared empty mapping of the leaves cannot be pickled
+        children = None if self.children is _NO_CHILDREN else self.children
+        return children, self.key, self.size, self.owner
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:  # noqa: D105
+        children, self.key, self.size, self.owner = state
+        self.children = _NO_CHILDREN if children is None else children
+
+
+_NO_CHILDREN: Dict[str, TrieNode] = cast(Dict[str, TrieNode], MappingProxyType({}))
+
+
+class KeyTrie:
+    """Segment trie over dotted keys.
+
+    Every node corresponds to a dotted prefix, so that finding a prefix costs
+    O(depth) and listing the keys below it costs O(subtree size). Copies share
+    their nodes, and only the nodes on the path to a changed key are copied
+    when either trie is modified.
+    """
+
+    __slots__ = ("root", "intern", "token")
+
+    def __init__(self, keys: Iterable[str] = (), intern: bool = False) -> None:
+        """Class Constructor.
+
+        Params:
+            keys: keys to add.
+            intern: whether to intern the key segments, so that segments
+                repeated across the trie share a single string.
+        """
+        self.token = object()
+        self.root = TrieNode(self.token)
+        self.intern = intern
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:  # noqa: D105
+        return self.root.size
+
+    def __contains__(self, key: str) -> bool:  # noqa: D105
+        node = self.find(key)
+        return node is not None and node.key is not None
+
+    def _own(self, node: TrieNode) -> TrieNode:
+        """Return `node`, or a copy of it if it is shared with another trie."""
+        if node.owner is self.token:
+            return node
+        clone = TrieNode(self.token)
+        if node.children is not _NO_CHILDREN:
+            clone.children = dict(node.children)
+        clone.key = node.key
+        clone.size = node.size
+        return clone
+
+    def copy(self) -> "KeyTrie":
+        """Return a copy of the trie in O(1), sharing the nodes of this one."""
+        # neither trie can modify the current nodes in place anymore
+        self.token = object()
+        new = KeyTrie(intern=self.intern)
+        new.root = self.root
+        return new
+
+    def find(self, prefix: str) -> Optional[TrieNode]:
+        """Return the node for `prefix`, or None if no key starts with it."""
+        node: Optional[TrieNode] = self.root
+        # str.split raises a TypeError for non-string prefixes
+        for segment in str.split(prefix, "."):
+            node = node.children.get(segment)  # type: ignore [union-attr]
+            if node is None:
+                return None
+        return node
+
+    def add(self, key: str) -> None:
+        """Add a key to the trie."""
+        if key in self:
+            return
+        node = self.root = self._own(self.root)
+        node.size += 1
+        for segment in key.split("."):
+            child = node.children.get(segment)
+            if child is None:
+                if self.intern:
+                    segment = sys.intern(segment)
+                child = TrieNode(self.token)
+            else:
+                child = self._own(child)
+            if node.children is _NO_CHILDREN:
+                node.children = {}
+            node.children[segment] = child
+            node = child
+            node.size += 1
+        node.key = key
+
+    def _own_path(self, segments: List[str]) -> List[TrieNode]:
+        """Return the nodes from the root to an existing prefix, owning them all."""
+        path = [self._own(self.root)]
+        self.root = path[0]
+        for segment in segments:
+            child = self._own(path[-1].children[segment])
+            path[-1].children[segment] = child
+            path.append(child)
+        return path
+
+    def _prune(self, path: List[TrieNode], segments: List[str]) -> None:
+        """Remove the nodes left without keys at the end of `path`."""
+        for parent, segment in zip(path[-2::-1], segments[::-1]):
+            if parent.children[segment].size:
+                break
+            del parent.children[segment]
+
+    def remove_prefix(self, prefix: str) -> List[str]:
+        """Remove `prefix` and every key below it.
+
+        Returns:
+            the list of removed keys.
+        """
+        node = self.find(prefix)
+        if node is None:
+            return []
+        removed = list(self.iter_keys(node))
+        segments = prefix.split(".")
+        path = self._own_path(segments)
+        for n in path:
+            n.size -= len(removed)
+        self._prune(path, segments)
+        return removed
+
+    def discard(self, key: str) -> None:
+        """Remove `key` if it is present, keeping the keys below it."""
+        if key not in self:
+            return
+        segments = key.split(".")
+        path = self._own_path(segments)
+        path[-1].key = None
+        for n in path:
+            n.size -= 1
+        self._prune(path, segments)
+
+    def clear(self) -> None:
+        """Remove all keys."""
+        self.root = TrieNode(self.token)
+
+    def sizeof(self, seen: Set[int]) -> int:
+        """Return the size in bytes of the trie, skipping the objects in `seen`."""
+        size = sys.getsizeof(self)
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            size += sys.getsizeof(node) + deep_sizeof(node.key, seen)
+            if node.children is not _NO_CHILDREN:
+                size += sys.getsizeof(node.children)
+                for segment, child in node.children.items():
+                    size += deep_sizeof(segment, seen)
+                    stack.append(child)
+        return size
+
+    @staticmethod
+    def iter_keys(node: TrieNode, strict: bool = False) -> Iterator[str]:
+        """Iterate over the keys stored in the subtree of `node`.
+
+        Params:
+            node: subtree root.
+            strict: whether to skip the key stored at `node` itself.
+        """
+        if node.key is not None and not strict:
+            yield node.key
+        stack = [iter(node.children.values())]
+        while stack:
+            for child in stack[-1]:
+                if child.key is not None:
+                    yield child.key
+                if child.children:
+                    stack.append(iter(child.children.values()))
+                    break
+            else:
+                stack.pop()
+
+    @staticmethod
+    def level_keys(node: TrieNode, levels: Optional[int]) -> List[str]:
+        """Return the keys below `node` truncated to `levels` segments.
+
+        The keys are relative to `node` and listed once each, in insertion
+        order. The cost is proportional to the number of nodes up to depth
+        `levels` instead of the number of keys below `node`.
+
+        Params:
+            node: subtree root, whose own key is skipped.
+            levels: number of segments to keep, or None to keep every segment.
+        """
+        result = []
+        stack = [(child, s, 1) for s, child in reversed(node.children.items())]
+        while stack:
+            child, path, depth = stack.pop()
+            if depth == levels or not child.children:
+                result.append(path)
+                continue
+            if child.key is not None:
+                result.append(path)
+            stack.extend(
+                (c, path + "." + s, depth + 1)
+                for s, c in reversed(child.children.items())
+            )
+        return result
+
+
+class RecordingChainMap(ChainMap):
+    """ChainMap that records every key looked up in it."""
+
+    def __init__(self, *maps: Any) -> None:  # noqa: D107
+        super().__init__(*maps)
+        self.keys_read: Set[Any] = set()
+
+    def __getitem__(self, key: Any) -> Any:  # noqa: D105
+        self.keys_read.add(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key: Any) -> bool:  # noqa: D105
+        self.keys_read.add(key)
+        return super().__contains__(key)
+
+
+class _HamtNode:
+    """Branch of a [PersistentMap][config.helpers.PersistentMap].
+
+    `entries` holds, in bit order, either `(key, value, seq)` leaves or
+    sub-nodes for the bits set in `bitmap`. Nodes below the last hash bits
+    hold colliding leaves only, with a zero bitmap.
+    """
+
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: Tuple[Any, ...]) -> None:  # noqa: D107
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+# bits of the key hash consumed at each level of a PersistentMap
+_HAMT_BITS = 5
+_HAMT_MASK = (1 << _HAMT_BITS) - 1
+_HASH_BITS = 64
+
+
+def _hamt_hash(key: Any) -> int:
+    return hash(key) & ((1 << _HASH_BITS) - 1)
+
+
+def _hamt_index(bitmap: int, bit: int) -> int:
+    return bin(bitmap & (bit - 1)).count("1")
+
+
+def _hamt_merge(leaf1: tuple, leaf2: tuple, hash2: int, shift: int) -> _HamtNode:
+    """Return a node holding two leaves whose hashes agree up to `shift`."""
+    if shift >= _HASH_BITS:
+        return _HamtNode(0, (leaf1, leaf2))
+    i1 = (_hamt_hash(leaf1[0]) >> shift) & _HAMT_MASK
+    i2 = (hash2 >> shift) & _HAMT_MASK
+    if i1 == i2:
+        child = _hamt_merge(leaf1, leaf2, hash2, shift + _HAMT_BITS)
+        return _HamtNode(1 << i1, (child,))
+    return _HamtNode(
+        (1 << i1) | (1 << i2),
+        (leaf1, leaf2) if i1 < i2 else (leaf2, leaf1),
+    )
+
+
+def _hamt_set(
+    node: _HamtNode,
+    leaf: tuple,
+    h: int,
+    shift: int,
+) -> Tuple[_HamtNode, Optional[tuple]]:
+    """Return a copy of `node` holding `leaf`, along with the leaf it replaced."""
+    key = leaf[0]
+    entries = node.entries
+    if shift >= _HASH_BITS:
+        for i, e in enumerate(entries):
+            if e[0] == key:
+                return _HamtNode(0, entries[:i] + (leaf,) + entries[i + 1 :]), e
+        return _HamtNode(0, entries + (leaf,)), None
+    bit = 1 << ((h >> shift) & _HAMT_MASK)
+    idx = _hamt_index(node.bitmap, bit)
+    if not node.bitmap & bit:
+        entries = entries[:idx] + (leaf,) + entries[idx:]
+        return _HamtNode(node.bitmap | bit, entries), None
+    entry = entries[idx]
+    new: Any
+    old = None
+    if isinstance(entry, _HamtNode):
+        new, old = _hamt_set(entry, leaf, h, shift + _HAMT_BITS)
+    elif entry[0] == key:
+        new, old = leaf, entry
+    else:
+        new = _hamt_merge(entry, leaf, h, shift + _HAMT_BITS)
+    return _HamtNode(node.bitmap, entries[:idx] + (new,) + entries[idx + 1 :]), old
+
+
+def _hamt_delete(node: _HamtNode, key: Any, h: int, shift: int) -> Tuple[Any, tuple]:
+    """Return a copy of `node` without `key`, along with the removed leaf.
+
+    The copy is None if it ends up empty, or a bare leaf if a single leaf
+    is left below the root, so that the parent can inline it.
+    """
+    entries = node.entries
+    if shift >= _HASH_BITS:
+        for i, e in enumerate(entries):
+            if e[0] == key:
+                rest = entries[:i] + entries[i + 1 :]
+                return (rest[0] if len(rest) == 1 else _HamtNode(0, rest)), e
+        raise KeyError(key)
+    bit = 1 << ((h >> shift) & _HAMT_MASK)
+    if not node.bitmap & bit:
+        raise KeyError(key)
+    idx = _hamt_index(node.bitmap, bit)
+    entry = entries[idx]
+    if isinstance(entry, _HamtNode):
+        new, old = _hamt_delete(entry, key, h, shift + _HAMT_BITS)
+    elif entry[0] == key:
+        new, old = None, entry
+    else:
+        raise KeyError(key)
+    if new is None:
+        bitmap = node.bitmap & ~bit
+        entries = entries[:idx] + entries[idx + 1 :]
+    else:
+        bitmap = node.bitmap
+        entries = entries[:idx] + (new,) + entries[idx + 1 :]
+    if not entries:
+        return None, old
+    if shift and len(entries) == 1 and not isinstance(entries[0], _HamtNode):
+        return entries[0], old
+    return _HamtNode(bitmap, entries), old
+
+
+class PersistentMap(Mapping[str, Any]):
+    """Immutable mapping implemented as a hash array mapped trie.
+
+    `set`, `delete` and `update` return new maps that share every node not
+    on the path to the changed keys, so that each change costs O(log n)
+    instead of copying the whole mapping. Keys are iterated in insertion
+    order, like in a dictionary.
+    """
+
+    __slots__ = ("_root", "_size", "_seq")
+
+    def __init__(self, items: Union[Mapping[str, Any], Iterable[Tuple[str, Any]]] = ()):
+        """Class Constructor.
+
+        Params:
+            items: mapping or iterable of key-value pairs to start from.
+        """
+        self._root = _HamtNode(0, ())
+        self._size = 0
+        self._seq = 0
+        if isinstance(items, Mapping):
+            items = items.items()
+        for key, value in items:
+            self._set_in_place(key, value)
+
+    def _set_in_place(self, key: str, value: Any) -> None:
+        h = _hamt_hash(key)
+        # look for the existing leaf first, so that updates keep their position
+        try:
+            seq = self._find(key, h)[2]
+        except KeyError:
+            seq = self._seq
+            self._seq += 1
+            self._size += 1
+        self._root = _hamt_set(self._root, (key, value, seq), h, 0)[0]
+
+    def _find(self, key: Any, h: int) -> tuple:
+        node = self._root
+        shift = 0
+        while True:
+            if shift >= _HASH_BITS:
+                for e in node.entries:
+                    if e[0] == key:
+                        return cast(tuple, e)
+                raise KeyError(key)
+            bit = 1 << ((h >> shift) & _HAMT_MASK)
+            if not node.bitmap & bit:
+                raise KeyError(key)
+            entry = node.entries[_hamt_index(node.bitmap, bit)]
+            if not isinstance(entry, _HamtNode):
+                if entry[0] == key:
+                    return cast(tuple, entry)
+                raise KeyError(key)
+            node = entry
+            shift += _HAMT_BITS
+
+    def _leaves(self) -> Iterator[tuple]:
+        """Iterate over the `(key, value, seq)` leaves, in no particular order."""
+        stack = [self._root]
+        while stack:
+            for entry in stack.pop().entries:
+                if isinstance(entry, _HamtNode):
+                    stack.append(entry)
+                else:
+                    yield entry
+
+    def _evolve(self, root: _HamtNode, size: int, seq: int) -> "PersistentMap":
+        new = PersistentMap.__new__(PersistentMap)
+        new._root, new._size, new._seq = root, size, seq
+        return new
+
+    def __getitem__(self, key: str) -> Any:  # noqa: D105
+        try:
+            return self._find(key, _hamt_hash(key))[1]
+        except TypeError:  # unhashable keys are never present
+            raise KeyError(key) from None
+
+    def __contains__(self, key: object) -> bool:  # noqa: D105
+        try:
+            self._find(key, _hamt_hash(key))
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __len__(self) -> int:  # noqa: D105
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:  # noqa: D105
+        return (leaf[0] for leaf in sorted(self._leaves(), key=lambda x: x[2]))
+
+    def __repr__(self) -> str:  # noqa: D105
+        return "%s(%r)" % (type(self).__name__, dict(self.items()))
+
+    def set(self, key: str, value: Any) -> "PersistentMap":  # noqa: A003
+        """Return a new map where `key` is mapped to `value`."""
+        h = _hamt_hash(key)
+        try:
+            leaf = self._find(key, h)
+        except KeyError:
+            root = _hamt_set(self._root, (key, value, self._seq), h, 0)[0]
+            return self._evolve(root, self._size + 1, self._seq + 1)
+        if leaf[1] is value:
+            return self
+        root = _hamt_set(self._root, (key, value, leaf[2]), h, 0)[0]
+        return self._evolve(root, self._size, self._seq)
+
+    def delete(self, key: str) -> "PersistentMap":
+        """Return a new map without `key`, raising a KeyError if it is missing."""
+        root = _hamt_delete(self._root, key, _hamt_hash(key), 0)[0]
+        return self._evolve(root or _HamtNode(0, ()), self._size - 1, self._seq)
+
+    def update(
+        self,
+        items: Union[Mapping[str, Any], Iterable[Tuple[str, Any]]],
+    ) -> "PersistentMap":
+        """Return a new map with the keys and values of `items` added."""
+        new = self._evolve(self._root, self._size, self._seq)
+        if isinstance(items, Mapping):
+            items = items.items()
+        for key, value in items:
+            new._set_in_place(key, value)
+        return new
+
+
 def as_bool(s: Any) -> bool:
     """Boolean value from an object.
 
@@ -85,37 +622,138 @@ def clean(key: str, value: Any, mask: str = "******") -> Any:
     return value
 
 
-def interpolate_standard(text: str, d: dict, found: Set[Tuple[str, ...]]) -> str:
+def _is_positional(field: str) -> bool:
+    """Check whether `str.format` reads a field from its positional arguments."""
+    return not field or field.isdigit()
+
+
+def _variable_name(
+    field: str,
+    d: Union[Mapping[str, Any], Sequence[Mapping[str, Any]]],
+) -> str:
+    """Return the name of the variable that a template field reads.
+
+    Fields that are keys in `d` are read whole, such as flattened keys like
+    `{a.b}`. Otherwise, attribute and index access (`{a.real}`, `{a[0]}`) read
+    the variable before the first `.` or `[`.
+
+    Params:
+       field: template field name.
+       d: dictionary, or list of dictionaries.
+    """
+    dicts = [d] if isinstance(d, Mapping) else d
+    if any(field in dict_ for dict_ in dicts):
+        return field
+    return field.partition(".")[0].partition("[")[0]
+
+
+_FORMATTER = string.Formatter()
+
+
+class Template:
+    """A `str.format` template split into literal text and replacement fields."""
+
+    __slots__ = ("text", "pieces", "variables", "direct")
+
+    def __init__(self, text: str) -> None:
+        """Class Constructor.
+
+        Params:
+           text: template string.
+        """
+        self.text = text
+        # (literal text, field name, format spec, conversion) tuples
+        self.pieces = tuple(string.Formatter().parse(text))
+        # sorted names of the fields in the template
+        self.variables = tuple(
+            sorted({x[1] for x in self.pieces if x[1] is not None}),
+        )
+        # whether the fields can be rendered from the parsed pieces, rather than
+        # by `str.format`, which also handles positional fields and fields nested
+        # in format specs
+        self.direct = not any(
+            (spec and "{" in spec) or (field is not None and _is_positional(field))
+            for _, field, spec, _ in self.pieces
+        )
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """Render the template.
+
+        Fields that are keys in `values` are read whole, so flattened keys such
+        as `{a.b}` render their value. Other fields keep their `str.format`
+        meaning of attribute and index access.
+
+        Params:
+           values: values of the template variables.
+        """
+        if not self.direct:
+            return self.text.format(**values)
+        result = []
+        for literal, field, spec, conversion in self.pieces:
+            result.append(literal)
+            if field is None:
+                continue
+            if field in values:
+                value = values[field]
+            else:
+                value = _FORMATTER.get_field(field, (), values)[0]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            elif conversion == "a":
+                value = ascii(value)
+            result.append(format(value, spec or ""))
+        return "".join(result)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def parse_template(text: str) -> Template:
+    """Return the parsed template for `text`, keeping the most recent ones cached.
+
+    Params:
+       text: template string.
+    """
+    return Template(text)
+
+
+def interpolate_standard(
+    text: str,
+    d: Mapping[str, Any],
+    found: Set[str],
+) -> str:
     """Return the string interpolated as many times as needed.
 
     Params:
        text: string possibly containing an interpolation pattern
        d: dictionary
-       found: variables found so far
+       found: variables being interpolated, from the outermost one
     """
     if not isinstance(text, str):
         return text
 
-    variables = tuple(
-        sorted(x[1] for x in string.Formatter().parse(text) if x[1] is not None),
-    )
+    template = parse_template(text)
+    variables = template.variables
 
     if not variables:
         return text
 
-    if variables in found:
-        raise ValueError("Cycle detected while interpolating keys")
-    else:
-        found.add(variables)
-
-    interpolated = {v: interpolate_standard(d[v], d, found) for v in variables}
-    return text.format(**interpolated)
+    interpolated = {}
+    for v in {_variable_name(v, d) for v in variables}:
+        # only a variable that references itself through its own value is a
+        # cycle, several variables may reference the same one
+        if v in found:
+            raise ValueError("Cycle detected while interpolating keys")
+        found.add(v)
+        interpolated[v] = interpolate_standard(d[v], d, found)
+        found.discard(v)
+    return template.render(interpolated)
 
 
 def interpolate_deep(
     attr: str,
     text: str,
-    d: List[dict],
+    d: Sequence[Mapping[str, Any]],
     resolved: Dict[str, str],
     levels: Dict[str, int],
     method: InterpolateEnumType,
@@ -132,14 +770,16 @@ def interpolate_deep(
     if not isinstance(text, str):
         return text
 
-    variables = {x[1] for x in string.Formatter().parse(text) if x[1] is not None}
+    template = parse_template(text)
+    variables = template.variables
 
     if not variables:
         return text
 
     length = len(d)
 
-    for variable in variables.difference(resolved.keys()):
+    names = dict.fromkeys(_variable_name(v, d) for v in variables)
+    for variable in [v for v in names if v not in resolved]:
         # start at 1 if this is the intended attribute
         level = levels.setdefault(variable, 1 if variable == attr else 0)
         # get the first level for which the variable is defined
@@ -153,8 +793,8 @@ def interpolate_deep(
             raise KeyError(variable)
         levels[variable] = level + 1
 
-        new_d = (
-            ([{}] * level) + d[level:]
+        new_d: Sequence[Mapping[str, Any]] = (
+            ([{}] * level) + list(d[level:])
             if method == InterpolateEnumType.DEEP_NO_BACKTRACK
             else d
         )
@@ -167,16 +807,18 @@ def interpolate_deep(
             method,
         )
 
-    return text.format(**resolved)
+    return template.render(resolved)
 
 
-def flatten(d: List[dict]) -> dict:
+def flatten(d: Sequence[Mapping[str, Any]]) -> Mapping[str, Any]:
     """Flatten a list of dictionaries.
 
     Params:
        d: dictionary list
     """
-    result = {}
+    if len(d) == 1:
+        return d[0]
+    result: Dict[str, Any] = {}
     [result.update(dict_) for dict_ in d[::-1]]
     return result
 
@@ -184,7 +826,7 @@ def flatten(d: List[dict]) -> dict:
 def interpolate_object(
     attr: str,
     obj: Any,
-    d: List[dict],
+    d: Sequence[Mapping[str, Any]],
     method: InterpolateEnumType,
 ) -> Any:
     """Return the interpolated object.
@@ -214,6 +856,102 @@ def interpolate_object(
         return obj
 
 
+def resolve_variables(
+    variables: Iterable[str],
+    d: Mapping[str, Any],
+) -> Dict[str, Any]:
+    """Return the interpolated values of `variables` and everything they reference.
+
+    Variables are resolved in topological order of their references, each of
+    them exactly once, with the `STANDARD` interpolation semantics.
+
+    Params:
+       variables: names of the variables to resolve
+       d: dictionary
+    """
+    resolved: Dict[str, Any] = {}
+    visiting: Set[str] = set()
+    for root in variables:
+        stack = [_variable_name(root, d)]
+        while stack:
+            name = stack[-1]
+            if name in resolved:
+                stack.pop()
+                continue
+            value = d[name]
+            if not isinstance(value, str) or not parse_template(value).variables:
+                resolved[name] = value
+                stack.pop()
+                continue
+            template = parse_template(value)
+            if name not in visiting:
+                # first visit: resolve the references before the variable itself
+                visiting.add(name)
+                for v in template.variables:
+                    v = _variable_name(v, d)
+                    if v in visiting:
+                        raise ValueError("Cycle detected while interpolating keys")
+                    if v not in resolved:
+                        stack.append(v)
+            else:
+                visiting.discard(name)
+                resolved[name] = template.render(resolved)
+                stack.pop()
+    return resolved
+
+
+def interpolate_all(
+    values: Mapping[str, Any],
+    d: Sequence[Mapping[str, Any]],
+    method: InterpolateEnumType,
+) -> Dict[str, Any]:
+    """Return every value interpolated.
+
+    Params:
+       values: values to interpolate, by key
+       d: dictionary list
+       method: interpolation method
+    """
+    if method != InterpolateEnumType.STANDARD:
+        # with the DEEP methods the value of a variable depends on the key being
+        # resolved, so there is no single dependency graph to share across keys
+        return {k: interpolate_object(k, v, d, method) for k, v in values.items()}
+
+    resolved = resolve_variables(
+        (
+            v
+            for text in _iter_strings(values.values())
+            for v in parse_template(text).variables
+        ),
+        ChainMap(*cast(List[dict], d)),
+    )
+
+    def materialize(obj: Any) -> Any:
+        if isinstance(obj, str):
+            template = parse_template(obj)
+            return template.render(resolved) if template.variables else obj
+        elif hasattr(obj, "__iter__"):
+            if isinstance(obj, tuple):
+                return tuple(materialize(x) for x in obj)
+            else:
+                return [materialize(x) for x in obj]
+        else:
+            return obj
+
+    return {k: materialize(v) for k, v in values.items()}
+
+
+def _iter_strings(objs: Iterable[Any]) -> Iterator[str]:
+    """Iterate over the strings in `objs`, including the ones nested in iterables."""
+    stack = list(objs)
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, str):
+            yield obj
+        elif hasattr(obj, "__iter__"):
+            stack.extend(obj)
+
+
 def parse_env_line(line: str) -> Tuple[str, str]:
     """Split an env line into variable and value."""
     try:
@@ -0,0 +1,434 @@
+"""Watch configuration files and reload them when they change."""
+
+import contextlib
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import weakref
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .configuration import Configuration
+from .configuration_set import ConfigurationSet
+from .files import file_signature
+
+# inotify events that can change the contents of a watched directory
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ONLYDIR = 0x1000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+# a burst of events postpones the reload by at most this many debounce periods
+_MAX_DEBOUNCES = 10
+
+_Signature = Optional[Tuple[Any, ...]]
+
+_logger = logging.getLogger(__name__)
+
+
+def _libc() -> Optional[ctypes.CDLL]:
+    """Return the C library if it provides inotify, or None."""
+    if not sys.platform.startswith("linux"):  # pragma: no cover
+        return None
+    try:
+        name = ctypes.util.find_library("c") or "libc.so.6"
+        libc = ctypes.CDLL(name, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+    except (OSError, AttributeError):  # pragma: no cover
+        return None
+    return libc
+
+
+def _close(fds: Tuple[int, ...]) -> None:
+    """Close the file descriptors."""
+    for fd in fds:
+        os.close(fd)
+
+
+def _tree(path: str) -> Iterator[Tuple[str, List[str]]]:
+    """Yield the directories and files read by a `PathConfiguration`."""
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if not d.startswith("..")]
+        yield root, files
+
+
+class _Target:
+    """A watched configuration with the directories and files it is read from."""
+
+    def __init__(self, cfg: Configuration):  # noqa: D107
+        from . import FileConfiguration, PathConfiguration
+
+        self.cfg = cfg
+        self.path: Optional[str] = None
+        self.is_dir = isinstance(cfg, PathConfiguration)
+        if self.is_dir:
+            self.path = os.path.abspath(cfg._path)
+        elif isinstance(cfg, FileConfiguration) and cfg._filename:
+            self.path = os.path.abspath(cfg._filename)
+
+    def directories(self) -> Set[str]:
+        """Return the directories whose entries affect the configuration.
+
+        Files are watched through their directory, which also sees them being
+        replaced by a rename or by swapping a symbolic link, as editors and
+        Kubernetes do. The directory of the target of a symbolic link is
+        watched too.
+        """
+        if self.path is None:
+            return set()
+        if self.is_dir:
+            return {root for root, _ in _tree(self.path)} or {self.path}
+        return {
+            os.path.dirname(self.path),
+            os.path.dirname(os.path.realpath(self.path)),
+        }
+
+    def signature(self) -> _Signature:
+        """Return the stat signature of the files, or None if it is unreliable."""
+        if self.path is None:
+            return ()
+        paths = (
+            [os.path.join(root, f) for root, files in _tree(self.path) for f in files]
+            if self.is_dir
+            else [self.path]
+        )
+        result = []
+        for path in sorted(paths):
+            try:
+                signature = file_signature(path)
+            except OSError:
+                signature = (-1, -1, -1)
+            if signature is None:
+                return None
+            result.append((path, *signature))
+        return tuple(result)
+
+
+class _InotifyBackend:
+    """Wait for changes with Linux inotify."""
+
+    def __init__(self, libc: ctypes.CDLL, targets: List[_Target]):  # noqa: D107
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        try:
+            self._wakeup = os.pipe()
+        except OSError:  # pragma: no cover
+            os.close(fd)
+            raise
+        self._libc = libc
+        self._fd = fd
+        self._targets = targets
+        # the descriptors are released with the backend if it is never closed
+        self._finalizer = weakref.finalize(self, _close, (fd, *self._wakeup))
+        # watch descriptors by directory, and the targets under each of them
+        self._watches: Dict[str, int] = {}
+        self._watched: Dict[int, Set[int]] = {}
+
+    def sync(self) -> Set[int]:
+        """Watch the directories of the targets that are not watched yet.
+
+        Returns:
+            the targets that got new watches, as the watched files may have
+            changed while they were not watched.
+        """
+        added = set()
+        for i, target in enumerate(self._targets):
+            for directory in target.directories():
+                wd = self._watches.get(directory)
+                if wd is None:
+                    wd = self._libc.inotify_add_watch(
+                        self._fd,
+                        os.fsencode(directory),
+                        _WATCH_MASK,
+                    )
+                    if wd < 0:  # e.g. directories that do not exist yet
+                        continue
+                    self._watches[directory] = wd
+                if i not in self._watched.setdefault(wd, set()):
+                    self._watched[wd].add(i)
+                    added.add(i)
+        return added
+
+    def wait(self, timeout: float) -> Optional[Set[int]]:
+        """Wait up to `timeout` seconds for events.
+
+        Returns:
+            the targets that had events, or None once the backend is closed.
+        """
+        ready, _, _ = select.select([self._fd, self._wakeup[0]], [], [], timeout)
+        if self._wakeup[0] in ready:
+            return None
+        if not ready:
+            return set()
+        changed: Set[int] = set()
+        with contextlib.suppress(BlockingIOError):
+            while True:
+                data = os.read(self._fd, 65536)
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                    offset += _EVENT_HEADER.size + length
+                    if mask & _IN_Q_OVERFLOW:
+                        changed.update(range(len(self._targets)))
+                        continue
+                    changed.update(self._watched.get(wd, ()))
+                    if mask & _IN_IGNORED:  # the directory is gone
+                        self._watched.pop(wd, None)
+                        self._watches = {
+                            k: v for k, v in self._watches.items() if v != wd
+                        }
+        return changed
+
+    def wake(self) -> None:
+        """Make `wait` return None."""
+        os.write(self._wakeup[1], b"\0")
+
+    def close(self) -> None:
+        """Release the file descriptors."""
+        self._finalizer()
+
+
+class _PollBackend:
+    """Wait for changes by comparing the stat signatures of the files."""
+
+    def __init__(self, targets: List[_Target], interval: float):  # noqa: D107
+        self._targets = targets
+        self._interval = interval
+        self._signatures: Dict[int, _Signature] = {}
+        self._stopped = threading.Event()
+
+    def sync(self) -> Set[int]:
+        """Record the signatures of the files of the targets not seen yet."""
+        for i, target in enumerate(self._targets):
+            if i not in self._signatures:
+                self._signatures[i] = target.signature()
+        return set()
+
+    def wait(self, timeout: float) -> Optional[Set[int]]:
+        """Wait up to `timeout` seconds, or the polling interval if shorter.
+
+        Returns:
+            the targets whose files changed, or None once the backend is closed.
+        """
+        if self._stopped.wait(min(timeout, self._interval)):
+            return None
+        changed = set()
+        for i, target in enumerate(self._targets):
+            signature = target.signature()
+            # changes to recently modified files may go unnoticed, but not once
+            # their signature can be trusted again
+            if signature != self._signatures.get(i):
+                changed.add(i)
+            self._signatures[i] = signature
+        return changed
+
+    def wake(self) -> None:
+        """Make `wait` return None."""
+        self._stopped.set()
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class Watcher:
+    """Reload file and path configurations when their files change.
+
+    A background thread waits for changes to the files, with inotify on Linux
+    or by polling their stat signature otherwise, and reloads the configurations
+    once no further changes happened for `debounce` seconds. Bursts of events,
+    such as editors writing and renaming files or Kubernetes swapping the
+    `..data` symbolic link of a mounted volume, result in a single reload.
+
+    Configuration sets are watched through their file and path configurations.
+    Other configurations are ignored.
+    """
+
+    def __init__(
+        self,
+        *configs: Union[Configuration, ConfigurationSet],
+        debounce: float = 0.1,
+        poll_interval: float = 1.0,
+        backend: Optional[str] = None,
+        on_change: Optional[Callable[[Configuration], None]] = None,
+        on_error: Optional[Callable[[Configuration, Exception], None]] = None,
+    ):
+        """Class Constructor.
+
+        configs: configurations to watch.
+        debounce: seconds without changes to wait for before reloading.
+        poll_interval: seconds between checks of the files when polling, and
+            between attempts to watch directories that do not exist yet.
+        backend: "inotify", "poll", or None to use inotify when available.
+        on_change: called with each configuration whose contents changed.
+        on_error: called with each configuration that failed to reload, and the
+            exception. The configuration keeps its previous contents.
+
+        Exceptions raised by `on_change` and `on_error` are logged, and do not
+        stop the watcher nor the reload of the other configurations.
+        """
+        from . import FileConfiguration, PathConfiguration
+
+        if backend not in (None, "inotify", "poll"):
+            raise ValueError("Unknown watcher backend %r" % backend)
+        layers: List[Configuration] = []
+        for cfg in configs:
+            layers.extend(cfg._configs if isinstance(cfg, ConfigurationSet) else [cfg])
+        self._targets = [
+            _Target(cfg)
+            for cfg in layers
+            if isinstance(cfg, (FileConfiguration, PathConfiguration))
+        ]
+        self._debounce = debounce
+        self._poll_interval = poll_interval
+        self._on_change = on_change
+        self._on_error = on_error
+        self._backend: Union[_InotifyBackend, _PollBackend]
+        libc = _libc() if backend != "poll" else None
+        if libc is None and backend == "inotify":  # pragma: no cover
+            raise OSError("inotify is not available")
+        try:
+            if libc is None:
+                raise OSError()
+            self._backend = _InotifyBackend(libc, self._targets)
+        except OSError:
+            if backend == "inotify":  # pragma: no cover
+                raise
+            self._backend = _PollBackend(self._targets, poll_interval)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def backend(self) -> str:
+        """Name of the backend used to wait for changes."""
+        return "inotify" if isinstance(self._backend, _InotifyBackend) else "poll"
+
+    def start(self) -> "Watcher":
+        """Start watching in a background thread."""
+        if self._closed:
+            raise RuntimeError("The watcher was stopped")
+        if self._thread is None:
+            self._backend.sync()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="config-watcher",
+                daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop watching and wait for the background thread to finish.
+
+        A stopped watcher cannot be started again.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._backend.wake()
+            self._thread.join()
+        self._backend.close()
+
+    def __enter__(self) -> "Watcher":  # noqa: D105
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:  # noqa: D105
+        self.stop()
+
+    def _run(self) -> None:
+        pending: Set[int] = set()
+        first = quiet = 0.0
+        longest = self._debounce * _MAX_DEBOUNCES
+        while True:
+            if pending:
+                deadline = min(quiet, first + longest)
+                timeout = max(deadline - time.monotonic(), 0.0)
+            else:
+                timeout = self._poll_interval
+            changed = self._backend.wait(timeout)
+            if changed is None:
+                return
+            if not changed and not pending:
+                # retry watching the directories that did not exist before
+                changed = self._backend.sync()
+            now = time.monotonic()
+            if changed:
+                if not pending:
+                    first = now
+                pending |= changed
+                quiet = now + self._debounce
+            if pending and now >= min(quiet, first + longest):
+                pending = self._reload(pending)
+                first = quiet = now + self._debounce
+
+    def _reload(self, pending: Set[int]) -> Set[int]:
+        """Reload the configurations of the `pending` targets.
+
+        Returns:
+            the targets that got new watches meanwhile, e.g. path configurations
+            with new subdirectories, and need to be reloaded again.
+        """
+        for i in sorted(pending):
+            cfg = self._targets[i].cfg
+            try:
+                changed = cfg.reload()
+            except Exception as err:
+                if self._on_error is not None:
+                    self._notify(self._on_error, cfg, err)
+                continue
+            if changed and self._on_change is not None:
+                self._notify(self._on_change, cfg)
+        return self._backend.sync()
+
+    @staticmethod
+    def _notify(callback: Callable[..., None], *args: Any) -> None:
+        """Call `callback`, logging the exceptions it raises."""
+        try:
+            callback(*args)
+        except Exception:
+            _logger.exception("Exception in watcher callback %r", callback)
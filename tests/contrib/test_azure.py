@@ -113,8 +113,12 @@ def test_deletion():  # type: ignore
 
     assert cfg["foo"] == "foo_val"
     assert "foo" in cfg._cache
+    assert "foo" in cfg
+    assert cfg.get_many(["foo", "nope"]) == {"foo": "foo_val", "nope": None}
     del d["foo"]
 
+    assert "foo" not in cfg
+
     with raises(KeyError):
         assert cfg["foo"] is KeyError
 
@@ -89,8 +89,12 @@ def test_deletion():  # type: ignore
 
     assert cfg.k["foo"] == "foo_val"
     assert "k" in cfg._cache
+    assert "k" in cfg and "k.foo" in cfg and "k.nope" not in cfg
+    assert cfg.get_many(["k.foo", "k.nope"], 0) == {"k.foo": "foo_val", "k.nope": 0}
     del dd["k"]
 
+    assert "k" not in cfg
+
     with raises(KeyError):
         assert cfg["k"] is KeyError
 
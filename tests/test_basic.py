@@ -5,7 +5,7 @@
 import json
 
 import pytest
-from config import config_from_dict
+from config import config, config_from_dict
 
 DICT = {
     "a1.B1.c1": 1,
@@ -427,3 +427,329 @@ def test_eq():  # type: ignore
     # equality with dictionaries  -- in this case the second one passes
     assert cfg == {k.lower(): v for k, v in DICT.items()}
     assert cfg == nested
+
+
+def test_subsets_follow_mutations():  # type: ignore
+    cfg = config_from_dict({"a.b.c": 1, "x": 2, "a.d": 3})
+    assert cfg["a"].as_dict() == {"b.c": 1, "d": 3}
+
+    cfg["a.b.e"] = 4
+    assert cfg["a.b"].as_dict() == {"c": 1, "e": 4}
+
+    del cfg["a.b"]
+    assert cfg["a"].as_dict() == {"d": 3}
+    with pytest.raises(KeyError):
+        cfg["a.b.c"]
+
+    cfg.update({"a": {"b": 5}})
+    assert cfg["a.b"] == 5
+    assert cfg.as_dict() == {"x": 2, "a.d": 3, "a.b": 5}
+
+    cfg.clear()
+    with pytest.raises(KeyError):
+        cfg["x"]
+    cfg["x"] = 6
+    assert cfg["x"] == 6
+
+
+def test_key_trie():  # type: ignore
+    from config.helpers import KeyTrie
+
+    trie = KeyTrie(["a.b.c", "a.b", "a.d", "e"])
+    assert len(trie) == 4
+    assert "a.b" in trie
+    assert "a" not in trie
+    assert trie.find("a.x") is None
+    assert list(trie.iter_keys(trie.find("a"))) == ["a.b", "a.b.c", "a.d"]
+    assert list(trie.iter_keys(trie.find("a.b"), strict=True)) == ["a.b.c"]
+
+    assert trie.remove_prefix("a.b") == ["a.b", "a.b.c"]
+    assert trie.remove_prefix("a.b") == []
+    assert len(trie) == 2
+    assert trie.find("a.b") is None
+    assert trie.remove_prefix("a.d") == ["a.d"]
+    assert trie.find("a") is None
+
+
+def test_subset_views():  # type: ignore
+    from config.configuration import ConfigurationView
+
+    cfg = config_from_dict(NESTED, lowercase_keys=True)
+    view = cfg["a1"]
+    nested = view["b1"]
+    assert isinstance(view, ConfigurationView)
+    assert nested["c1"] == 1
+    assert view.get("b2.c1") == "a"
+    assert cfg.a1.b1.c2 == 2
+    # views share the storage of the original instance until a write happens
+    assert view._source[0] is cfg._config
+    assert nested._source[0] is cfg._config
+
+    # writes to the view copy the subset first
+    view["b1.c1"] = 100
+    assert view._source is None
+    assert view["b1.c1"] == 100
+    assert cfg["a1.b1.c1"] == 1
+    assert nested["c1"] == 1
+
+    # writes to the original detach the views still sharing its storage
+    cfg["a1.b1.c1"] = 200
+    assert cfg["a1.b1.c1"] == 200
+    assert nested._source is None
+    assert nested.as_dict() == {"c1": 1, "c2": 2, "c3": 3}
+    assert view["b1.c1"] == 100
+
+
+def test_accessor():  # type: ignore
+    cfg = config_from_dict({"limits.rate": "10", "cache.ttl": 5})
+    rate = cfg.accessor("limits.rate", type=int)
+    ttl = cfg.accessor("cache.ttl")
+    assert rate() == 10
+    assert rate.get() == 10
+    assert ttl() == 5
+
+    generation = cfg._generation
+    assert rate() == 10
+    assert cfg._generation == generation
+
+    cfg["limits.rate"] = "20"
+    assert cfg._generation != generation
+    assert rate() == 20
+    assert ttl() == 5
+
+    cfg.update({"cache": {"ttl": 6}})
+    assert ttl() == 6
+
+    # writes to the dictionary returned by `as_dict` do not reach the storage,
+    # and the contents published in their place bump the generation
+    d = cfg.as_dict()
+    d["cache.ttl"] = 7
+    assert ttl() == 6
+    generation = cfg._generation
+    cfg._config = d
+    assert cfg._generation != generation
+    assert ttl() == 7
+
+    del cfg["limits"]
+    with pytest.raises(KeyError):
+        rate()
+
+
+def test_level_keys():  # type: ignore
+    cfg = config_from_dict({"a": 0, "a.b.c": 1, "a.b.d": 2, "a.e": 3, "f": 4})
+    assert list(cfg.keys()) == ["a", "f"]
+    assert list(cfg.keys(levels=2)) == ["a", "a.b", "a.e", "f"]
+    assert list(cfg.keys(levels=3)) == ["a", "a.b.c", "a.b.d", "a.e", "f"]
+    assert list(cfg) == ["a", "f"]
+    assert list(reversed(cfg)) == ["f", "a"]
+    assert len(cfg) == 2
+    with cfg.dotted_iter():
+        assert list(cfg) == ["a", "a.b.c", "a.b.d", "a.e", "f"]
+        assert len(cfg) == 5
+
+    # views list the keys below their prefix only
+    view = cfg["a"]
+    assert list(view.keys()) == ["b", "e"]
+    assert dict(view.items(levels=2)) == {"b.c": 1, "b.d": 2, "e": 3}
+    assert view._source is not None
+
+    # the groupings follow mutations
+    cfg["g.h"] = 5
+    assert list(cfg.keys()) == ["a", "f", "g"]
+    del cfg["a"]
+    assert list(cfg) == ["f", "g"]
+    assert list(cfg.values()) == [4, {"h": 5}]
+
+
+def test_lazy_views():  # type: ignore
+    cfg = config_from_dict({"a": 0, "a.b.c": 1, "a.b.d": 2, "a.e": 3, "f": 4})
+    keys, values, items = cfg.keys(), cfg.values(), cfg.items()
+    assert len(keys) == len(values) == len(items) == 2
+    assert "a" in keys and "f" in keys
+    assert "a.b" not in keys and "x" not in keys and 1 not in keys
+    assert "a.b" in cfg.keys(levels=2) and "a.b.c" not in cfg.keys(levels=2)
+    assert "a" in cfg.keys(levels=3)  # shallower keys holding a value
+    assert "a.e" in cfg.keys(levels=3)
+    assert ("f", 4) in items and ("f", 5) not in items and "f" not in items
+    assert 4 in values and 5 not in values
+    assert keys == {"a", "f"}
+    assert keys | {"g"} == {"a", "f", "g"}
+    assert next(iter(items)) == ("a", {"b.c": 1, "b.d": 2, "e": 3})
+    assert list(reversed(keys)) == ["f", "a"]
+    assert list(reversed(values))[0] == 4
+    assert repr(keys) == "ConfigurationKeysView(['a', 'f'])"
+
+    # the views reflect changes to the configuration
+    cfg["g"] = 5
+    assert len(keys) == 3
+    assert "g" in keys
+    assert ("g", 5) in items
+    assert list(values)[-1] == 5
+
+
+def test_contains_uses_index():  # type: ignore
+    cfg = config_from_dict(
+        {"a.b": "{missing}", "a.c": {}, "d": 1},
+        interpolate=True,
+    )
+    assert "a" in cfg and "a.b" in cfg and "d" in cfg
+    assert "a.c" not in cfg and "a.b.c" not in cfg and "x" not in cfg
+    # values are neither built nor interpolated
+    assert not cfg._interpolated
+    view = cfg["a"]
+    assert "b" in view and "a" not in view
+    assert view._source is not None
+
+
+def test_compact():  # type: ignore
+    d = {
+        "services.s%d.g%d.%s" % (s, g, leaf): 1
+        for s in range(10)
+        for g in range(10)
+        for leaf in ("host", "port", "timeout")
+    }
+    cfg = config_from_dict(d)
+    report = cfg.memory_usage()
+    assert set(report) == {"table", "keys", "values", "index", "total"}
+    assert report["total"] == sum(v for k, v in report.items() if k != "total")
+
+    other = config_from_dict(d)
+    other.compact()
+    assert other == cfg
+    assert other.memory_usage()["index"] < report["index"]
+
+    # keys are shared across compacted configurations
+    cfg.compact()
+    assert cfg == other
+    assert cfg.memory_usage()["index"] == other.memory_usage()["index"]
+    cfg["services.s0.g0.ttl"] = 2
+    other["services.s0.g0.ttl"] = 2
+    assert all(a is b for a, b in zip(cfg.as_dict(), other.as_dict()))
+
+    cfgset = config(cfg, other)
+    assert cfgset.memory_usage()["keys"] == cfg.memory_usage()["keys"]
+
+
+def test_flatten_dict():  # type: ignore
+    import sys
+
+    from config import Configuration
+
+    # deeper than the recursion limit
+    depth = sys.getrecursionlimit() + 100
+    d = {"leaf": 1}
+    for _ in range(depth):
+        d = {"k": d}
+    cfg = config_from_dict(d)
+    assert cfg.as_dict() == {"k." * depth + "leaf": 1}
+
+    # values stored directly win over nested ones
+    cfg = config_from_dict(
+        {"A.b": 1, "a": {"B": 2, "c": {"D": 3}}},
+        lowercase_keys=True,
+    )
+    assert cfg.as_dict() == {"a.b": 1, "a.c.d": 3}
+    assert config_from_dict({"a": cfg, "b": 2}).as_dict() == {
+        "a.a.b": 1,
+        "a.a.c.d": 3,
+        "b": 2,
+    }
+
+    # trusted flat data is used as is
+    flat = {"a.b": 1, "c": 2}
+    cfg = Configuration.from_flat(flat, lowercase_keys=True)
+    assert cfg._config is flat
+    assert cfg["a"] == {"b": 1}
+    cfg.update({"D": 3})
+    assert cfg["d"] == 3
+
+
+def test_typed_cache(mocker):  # type: ignore
+    import base64
+
+    import config.configuration
+
+    spy = mocker.spy(config.configuration, "as_bool")
+    cfg = config_from_dict(
+        {
+            "flag": " Yes ",
+            "n": "10",
+            "x": "1.5",
+            "l": [[1]],
+            "b": base64.b64encode(b"hi"),
+        },
+    )
+    assert cfg.get_bool("flag") is True
+    assert cfg.get_bool("flag") is True
+    assert spy.call_count == 1
+    assert cfg.get_int("n") == 10 and cfg.get_float("x") == 1.5
+    decoded = cfg.base64decode("b")
+    assert decoded == b"hi" and cfg.base64decode("b") is decoded
+    assert cfg.base64encode("n") == base64.b64encode(b"10")
+
+    # lists are copied on every read
+    lst = cfg.get_list("l")
+    lst[0].append(2)
+    assert cfg.get_list("l") == [[1]]
+
+    # changes invalidate the cache
+    cfg["flag"] = "off"
+    assert cfg.get_bool("flag") is False
+    assert spy.call_count == 2
+    cfg.update({"n": "11"})
+    assert cfg.get_int("n") == 11
+    # the dictionary returned by `as_dict` is a copy, which changes nothing
+    d = cfg.as_dict()
+    d["n"] = "12"
+    del d["x"]
+    assert cfg.get_int("n") == 11 and cfg.get_float("x") == 1.5
+    cfg._config = d
+    assert cfg.get_int("n") == 12
+    with pytest.raises(KeyError):
+        cfg.get_float("x")
+    del cfg["n"]
+    with pytest.raises(KeyError):
+        cfg.get_int("n")
+
+
+def test_get_many():  # type: ignore
+    cfg = config_from_dict({"a.b": 1, "a.c": "{d}", "d": 2}, interpolate=True)
+    assert cfg.get_many(["a.b", "a.c", "d", "x", "a.b.c"]) == {
+        "a.b": 1,
+        "a.c": "2",
+        "d": 2,
+        "x": None,
+        "a.b.c": None,
+    }
+    result = cfg.get_many(["a", "x"], default=0)
+    assert result["a"] == cfg["a"] and result["x"] == 0
+    assert cfg["a"].get_many(["b", "d"]) == {"b": 1, "d": None}
+
+
+def test_pickle_and_deepcopy():  # type: ignore
+    import copy
+    import pickle
+
+    cfg = config_from_dict(NESTED, lowercase_keys=True)
+    assert cfg["a1.b1.c1"] == 1
+    view = cfg["a1"]
+    shared = cfg.copy()
+    cfgset = config(cfg, {"z": 1})
+    assert cfgset["a1.b2.c1"] == "a"
+    frozen = cfg.freeze()
+    assert frozen["a1.b1.c1"] == 1
+
+    for round_trip in (lambda obj: pickle.loads(pickle.dumps(obj)), copy.deepcopy):
+        objs = [cfg, view, shared, cfgset, frozen]
+        copies = [round_trip(obj) for obj in objs]
+        assert copies == objs
+        assert hash(copies[-1]) == hash(frozen)
+
+        # the copies no longer share their storage with the originals
+        new_cfg, new_view, new_shared = copies[:3]
+        new_cfg["a1.b1.c1"] = 5
+        assert new_view["b1.c1"] == 1
+        assert new_shared["a1.b1.c1"] == 1
+        assert cfg["a1.b1.c1"] == 1
+        new_shared["a1.b1.c1"] = 6
+        assert shared["a1.b1.c1"] == 1
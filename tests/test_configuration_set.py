@@ -5,9 +5,14 @@
 import json
 import os
 import sys
+import threading
 
 from config import (
+    Configuration,
     ConfigurationSet,
+    InterpolateEnumType,
+    JSONConfiguration,
+    LoadError,
     config,
     config_from_dict,
     config_from_dotenv,
@@ -18,6 +23,7 @@ from config import (
     config_from_python,
     create_path_from_config,
 )
+from config.configuration_set import _MergeState
 
 try:
     import yaml
@@ -966,3 +972,426 @@ def test_merging_values():  # type: ignore
 
     assert cfg["a5.b1"] == {"c1": 1, "c2": 3}
     assert cfg.a5.b1 == {"c1": 1, "c2": 3}
+
+
+def test_merging_views(mocker):  # type: ignore
+    from config.configuration import ConfigurationView
+
+    base = config_from_dict({"x.a5.b1.c2": 3, "x.l": [1]})
+    view = base.x
+    cfg = ConfigurationSet(view, config_from_dict({"a5.b1.c1": 1, "a5.b1.c2": 2}))
+    spy = mocker.spy(ConfigurationView, "_detach")
+
+    # reading subtrees and the merged contents leaves the views sharing the storage
+    assert cfg["a5.b1"] == {"c1": 1, "c2": 3}
+    assert cfg.a5.as_dict() == {"b1.c1": 1, "b1.c2": 3}
+    assert cfg["l"] == [1]
+    assert cfg.as_dict() == {"a5.b1.c1": 1, "a5.b1.c2": 3, "l": [1]}
+    assert str(cfg) and cfg.resolve()["a5.b1.c2"] == 3
+    assert spy.call_count == 0
+    assert view._source is not None
+
+    # writes to the original still detach the view, which keeps its contents
+    base["x.a5.b1.c2"] = 4
+    assert spy.call_count > 0 and view._source is None
+    assert cfg["a5.b1"] == {"c1": 1, "c2": 3}
+
+
+def test_accessor():  # type: ignore
+    cfg1 = config_from_dict({"limits.rate": 10})
+    cfg2 = config_from_dict({"limits.rate": 1, "cache.ttl": 5})
+    cfg = ConfigurationSet(cfg1, cfg2)
+
+    rate = cfg.accessor("limits.rate")
+    ttl = cfg.accessor("cache.ttl", type=str)
+    assert rate() == 10
+    assert ttl() == "5"
+
+    cfg2["cache.ttl"] = 6
+    assert ttl() == "6"
+    del cfg1["limits"]
+    assert rate() == 1
+    cfg["limits.rate"] = 100
+    assert rate() == 100
+
+
+def test_get_many():  # type: ignore
+    cfg1 = config_from_dict({"a.b": 1, "c": "{d}-x", "e.f": 1})
+    cfg2 = config_from_dict({"a.b": 2, "a.g": 3, "d": "v", "e": 2})
+    cfg = ConfigurationSet(cfg1, cfg2, interpolate=True)
+
+    keys = ["a.b", "a", "c", "e", "missing", "a.g"]
+    result = cfg.get_many(keys, default=-1)
+    assert list(result) == keys
+    assert result == {k: cfg.get(k, -1) for k in keys}
+    assert result["a"].as_dict() == {"b": 1, "g": 3}
+    assert result["c"] == "v-x"
+    assert result["missing"] == -1
+    assert cfg.get_many([]) == {}
+
+
+def test_merged_view_cache(mocker):  # type: ignore
+    import random
+
+    random.seed(0)
+    layers = [
+        config_from_dict({"k%d" % j: (i, j) for j in range(i, 20, 2)}) for i in range(4)
+    ]
+    cfg = ConfigurationSet(*layers)
+
+    def merged():  # type: ignore
+        result = {}
+        for layer in layers[::-1]:
+            result.update(layer.as_dict())
+        return result
+
+    keys = cfg.keys()
+    assert cfg.as_dict() == merged()
+    view = cfg._merged_view()
+    snapshot = view.as_dict()
+    # cached until a layer changes
+    assert cfg._merged_view() is view
+    rebuilds = mocker.spy(_MergeState, "__init__")
+
+    for step in range(200):
+        layer = random.choice(layers)
+        key = "k%d" % random.randrange(25)
+        if random.random() < 0.6:
+            layer[key] = step
+        elif key in layer:
+            del layer[key]
+        assert cfg.as_dict() == merged()
+        assert len(keys) == len(merged())
+    # the changes were merged incrementally, into new merged views
+    assert rebuilds.call_count == 0
+    assert cfg._merged_view() is not view
+    # leaving the previous ones untouched
+    assert view.as_dict() == snapshot
+
+    # reloads are picked up too
+    layers[1]._replace_config({"z": 1})
+    assert cfg.as_dict() == merged()
+    assert rebuilds.call_count == 0
+
+    # changing the layers rebuilds the merge
+    cfg["new"] = 1
+    assert cfg["new"] == 1 and "new" in list(cfg.keys())
+    assert rebuilds.call_count == 1
+
+
+def test_merged_view_concurrent_reload():  # type: ignore
+    old = {"k%d" % i: i for i in range(2000)}
+    new = {"n%d" % i: i for i in range(2001)}
+    layer = config_from_dict(old)
+    cfg = ConfigurationSet(layer, config_from_dict({"other": 1}))
+    done = threading.Event()
+    sizes = set()
+
+    def read():  # type: ignore
+        while not done.is_set():
+            sizes.add(len(cfg.as_dict()))
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    for thread in readers:
+        thread.start()
+    for i in range(100):
+        layer._replace_config(dict(new if i % 2 == 0 else old))
+    done.set()
+    for thread in readers:
+        thread.join()
+    # readers only ever see the merge of complete layers
+    assert sizes <= {2001, 2002}
+
+
+def test_keys_view_follows_layers():  # type: ignore
+    layer = config_from_dict({"a": 1})
+    cfg = ConfigurationSet(layer, config_from_dict({"b": 2}))
+    keys, values, items = cfg.keys(), cfg.values(), cfg.items()
+    assert sorted(keys) == ["a", "b"]
+
+    # writes to the layers are seen without reading the set in between
+    layer["c"] = 3
+    assert sorted(keys) == ["a", "b", "c"] and "c" in keys
+    assert sorted(values) == [1, 2, 3]
+    assert ("c", 3) in items
+
+    # and so are changes to the list of layers
+    cfg.configs = [config_from_dict({"d": 4})]
+    assert list(keys) == ["d"] and list(values) == [4] and list(items) == [("d", 4)]
+    cfg["e"] = 5
+    assert sorted(keys) == ["d", "e"]
+    with cfg.dotted_iter():
+        assert sorted(cfg.keys()) == ["d", "e"]
+
+
+def test_lookup_index(mocker):  # type: ignore
+    top = config_from_dict({"a.b": 1})
+    middle = config_from_dict({"c": 2, "a.c": 3})
+    bottom = config_from_dict({"c": 4, "d": 5, "a.b": 6})
+    cfg = ConfigurationSet(top, middle, bottom)
+
+    assert cfg["d"] == 5
+    assert cfg["c"] == 2
+    assert cfg.a.as_dict() == {"b": 1, "c": 3}
+    with pytest.raises(KeyError):
+        assert cfg["e"]
+    with pytest.raises(AttributeError):
+        assert cfg.e
+
+    # leaf lookups only read the highest layer holding the key
+    spies = [mocker.spy(layer, "_lookup") for layer in (top, middle, bottom)]
+    assert cfg["c"] == 2
+    assert [s.call_count for s in spies] == [0, 1, 0]
+
+    # the index follows changes and reloads of the layers
+    top["c"] = 7
+    assert cfg["c"] == 7
+    del top["c"]
+    middle._replace_config({"a.c": 3})
+    assert cfg["c"] == 4
+    bottom._replace_config({})
+    assert "c" not in cfg
+    assert cfg.get("c", 0) == 0
+    top["a.e"] = 8
+    assert cfg.a.as_dict() == {"b": 1, "c": 3, "e": 8}
+
+
+def test_interpolation_dicts_cache():  # type: ignore
+    top = config_from_dict({"a": "{b}-{var}"})
+    bottom = config_from_dict({"b": "x", "c": "{a}"})
+    cfg = ConfigurationSet(top, bottom, interpolate={"var": "v"})
+    assert cfg["a"] == "x-v"
+    assert cfg["c"] == "x-v"
+    # the interpolation variables are not added to the layers
+    assert top.as_dict() == {"a": "{b}-{var}"}
+
+    d = cfg._interpolation_dicts()
+    assert cfg._interpolation_dicts() is d
+    bottom["b"] = "y"
+    assert cfg["a"] == "y-v"
+    assert cfg._interpolation_dicts() is not d
+    assert cfg.resolve().as_dict() == {"a": "y-v", "b": "y", "c": "y-v"}
+
+    cfg = ConfigurationSet(
+        top,
+        bottom,
+        interpolate={"var": "v"},
+        interpolate_type=InterpolateEnumType.DEEP,
+    )
+    assert cfg["c"] == "y-v"
+    assert top.as_dict() == {"a": "{b}-{var}"}
+
+
+def test_reload_parallel(tmp_path):  # type: ignore
+    files = [tmp_path / ("f%d.json" % i) for i in range(4)]
+    for i, f in enumerate(files):
+        f.write_text(json.dumps({"a": i, "k%d" % i: i}))
+    cfg = config(*map(str, files), {"b": 1})
+    assert cfg["a"] == 0
+    assert cfg["k3"] == 3
+
+    for i, f in enumerate(files):
+        f.write_text(json.dumps({"a": i + 10, "k%d" % i: i + 10}))
+    cfg.reload(parallel=True, max_workers=2)
+    assert cfg["a"] == 10
+    assert [cfg["k%d" % i] for i in range(4)] == [10, 11, 12, 13]
+    assert cfg["b"] == 1
+
+    # nothing is published unless every configuration reloads
+    files[0].write_text(json.dumps({"a": 20}))
+    files[2].write_text("not json")
+    files[3].unlink()
+    with pytest.raises(LoadError) as err:
+        cfg.reload(parallel=True)
+    assert sorted(err.value.errors) == [2, 3]
+    assert isinstance(err.value.errors[3], FileNotFoundError)
+    assert cfg["a"] == 10
+    assert cfg.configs[0]["a"] == 10
+
+
+def test_reload_parallel_concurrent(tmp_path):  # type: ignore
+    path = tmp_path / "f.json"
+    path.write_text('{"a": 1}')
+    interrupt = []
+    results = []
+
+    class Layer(JSONConfiguration):
+        def _parse(self, data, read_from_file=False):  # type: ignore
+            if interrupt:
+                # another thread reloads the layer while it is being read
+                interrupt.pop()
+                thread = threading.Thread(target=lambda: results.append(self.reload()))
+                thread.start()
+                thread.join()
+            return super()._parse(data, read_from_file)
+
+    cfg = Layer(str(path), read_from_file=True)
+    cfgs = ConfigurationSet(cfg, config_from_dict({"b": 1}))
+    path.write_text('{"a": 22}')
+    interrupt.append(True)
+    cfgs.reload(parallel=True)
+    assert results == [True]
+    assert cfgs["a"] == 22
+
+
+def test_reload_parallel_atomic(tmp_path):  # type: ignore
+    files = [tmp_path / ("f%d.json" % i) for i in range(2)]
+    for i, f in enumerate(files):
+        f.write_text(json.dumps({"a": 1, "k%d" % i: 1, "x.y%d" % i: 1}))
+    seen = []
+    cfgs = None
+
+    class Layer(JSONConfiguration):
+        def _publish_contents(self, contents, changed):  # type: ignore
+            super()._publish_contents(contents, changed)
+            if cfgs is None:
+                return
+            # read the set while only some of the layers were updated
+            seen.append(
+                (
+                    cfgs["a"],
+                    cfgs.get_many(["k0", "k1"]),
+                    cfgs["x"].as_dict(),
+                    cfgs.as_dict(),
+                    "k1" in cfgs,
+                ),
+            )
+
+    layers = [Layer(str(f), read_from_file=True) for f in files]
+    cfgs = ConfigurationSet(*layers, config_from_dict({"b": 1}))
+    for i, f in enumerate(files):
+        f.write_text(json.dumps({"a": 2, "k%d" % i: 2, "x.y%d" % i: 2}))
+    assert cfgs.reload(parallel=True) is True
+    new = (
+        2,
+        {"k0": 2, "k1": 2},
+        {"y0": 2, "y1": 2},
+        {"a": 2, "k0": 2, "k1": 2, "x.y0": 2, "x.y1": 2, "b": 1},
+        True,
+    )
+    assert seen == [new, new]
+    assert cfgs._pinned is None
+    assert cfgs["k1"] == 2 and cfgs.configs[0]["k0"] == 2
+
+
+def test_reload_parallel_layer_kinds(tmp_path):  # type: ignore
+    files = [tmp_path / ("f%d.json" % i) for i in range(2)]
+    for i, f in enumerate(files):
+        f.write_text(json.dumps({"k%d" % i: 1}))
+    reloads = []
+
+    class Lazy(Configuration):
+        # fetches its values when they are used, like the secret stores
+        def reload(self):  # type: ignore
+            reloads.append(self)
+            if self.get("fail"):
+                raise RuntimeError("unavailable")
+            return True
+
+    lazy = Lazy({"c": 1})
+    nested = ConfigurationSet(config_from_json(str(files[1]), read_from_file=True))
+    cfgs = ConfigurationSet(
+        config_from_json(str(files[0]), read_from_file=True),
+        nested,
+        lazy,
+        config_from_dict({"d": 1}),
+    )
+
+    # nested sets are loaded along with the other layers
+    files[1].write_text(json.dumps({"k1": 2}))
+    assert cfgs.reload(parallel=True) is True
+    assert cfgs["k1"] == 2 and nested["k1"] == 2
+    assert reloads == [lazy]
+
+    # and the failures of every kind of layer are reported together
+    lazy["fail"] = True
+    files[0].write_text(json.dumps({"k0": 3}))
+    files[1].write_text("not json")
+    with pytest.raises(LoadError) as err:
+        cfgs.reload(parallel=True)
+    assert sorted(err.value.errors) == [1, 2]
+    assert isinstance(err.value.errors[1], LoadError)
+    assert sorted(err.value.errors[1].errors) == [0]
+    assert isinstance(err.value.errors[2], RuntimeError)
+    assert cfgs["k0"] == 1 and cfgs["k1"] == 2
+
+
+def test_config_parallel(tmp_path):  # type: ignore
+    files = [tmp_path / ("f%d.json" % i) for i in range(3)]
+    for i, f in enumerate(files):
+        f.write_text(json.dumps({"a": i, "k%d" % i: i}))
+    layer = config_from_dict({"a": -1})
+    sources = [
+        str(files[0]),
+        {"b": 1},
+        layer,
+        str(files[1]),
+        ("json", str(files[2]), True),
+    ]
+
+    cfg = config(*sources, parallel=True, max_workers=2)
+    assert cfg == config(*sources)
+    assert cfg.configs[2] is layer
+    assert cfg["a"] == 0 and cfg["k2"] == 2
+
+    files[1].write_text("not json")
+    files[2].unlink()
+    with pytest.raises(LoadError) as err:
+        config(*sources, parallel=True)
+    assert sorted(err.value.errors) == [3, 4]
+    assert isinstance(err.value.errors[4], FileNotFoundError)
+
+
+def test_config_processes(tmp_path):  # type: ignore
+    from concurrent.futures import ProcessPoolExecutor
+
+    from config import config_from_yaml
+
+    files = {"f.json": JSON, "f.ini": INI, "f.env": DOTENV_PREFIX}
+    if yaml:
+        files["f.yaml"] = YAML
+    if toml:
+        files["f.toml"] = TOML
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+    sources = [str(tmp_path / name) for name in files] + [DICT2_1, "env"]
+
+    kwargs = {"prefix": "CONFIG", "lowercase_keys": True}
+    cfg = config(*sources, parallel="processes", max_workers=2, **kwargs)
+    assert cfg == config(*sources, **kwargs)
+    assert [type(c) for c in cfg.configs] == [
+        type(c) for c in config(*sources, **kwargs).configs
+    ]
+    for _ in range(2):
+        assert (
+            config(
+                *sources,
+                parallel="processes",
+                cache_dir=tmp_path / "cache",
+                **kwargs,
+            )
+            == cfg
+        )
+    assert len(os.listdir(tmp_path / "cache")) == len(files)
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        cfg = config_from_ini(str(tmp_path / "f.ini"), True, process_pool=pool)
+        assert cfg == config_from_ini(str(tmp_path / "f.ini"), True)
+        cfg = config_from_json(
+            str(tmp_path / "missing.json"),
+            True,
+            ignore_missing_paths=True,
+            process_pool=pool,
+        )
+        assert cfg.as_dict() == {}
+        if yaml:
+            with pytest.raises(ValueError, match="dictionary"):
+                config_from_yaml("- a\n- b", process_pool=pool)
+
+    (tmp_path / "f.json").unlink()
+    with pytest.raises(LoadError) as err:
+        config(*sources, parallel="processes", **kwargs)
+    assert list(err.value.errors) == [0]
+
+    with pytest.raises(ValueError, match="process"):
+        config(*sources, parallel="process", **kwargs)
@@ -178,6 +178,79 @@ def test_copy():  # type: ignore
     assert cfg == cfg2
 
 
+def test_copy_on_write():  # type: ignore
+    import gc
+
+    cfg = config_from_dict(DICT, lowercase_keys=True)
+    cfg2 = cfg.copy()
+    # the storage is shared until either side is written to
+    assert cfg2._config is cfg._config
+    assert cfg2["a1.b1.c1"] == 1
+
+    cfg2["a1.b1.c1"] = 10
+    assert cfg2._config is not cfg._config
+    assert cfg["a1.b1.c1"] == 1 and cfg2["a1.b1.c1"] == 10
+    # only the path to a new key is copied in the key index
+    cfg2["a1.b3"] = 5
+    assert "a1.b3" not in cfg
+    _, trie = cfg._key_index()
+    _, trie2 = cfg2._key_index()
+    assert trie.root.children["a2"] is trie2.root.children["a2"]
+    assert trie.root.children["a1"] is not trie2.root.children["a1"]
+
+    cfg3 = cfg.copy()
+    del cfg["a2"]
+    assert "a2" not in cfg and "a2" in cfg3 and "a2" in cfg2
+    cfg3.update({"a1.b1.c1": 100})
+    assert [c["a1.b1.c1"] for c in (cfg, cfg2, cfg3)] == [1, 10, 100]
+
+    # copies that are gone don't force a copy of the storage
+    cfg4 = cfg.copy()
+    config_ = cfg._config
+    del cfg4
+    gc.collect()
+    cfg["a3"] = 3
+    assert cfg._config is config_
+    assert cfg.copy().as_dict() == cfg.as_dict()
+
+    # reading the dictionary does not stop sharing the storage
+    cfg5 = cfg.copy()
+    view = cfg["a1"]
+    cfg5.as_dict()["a3"] = 99
+    cfg.as_dict()["a1.b1.c1"] = 7
+    assert cfg5._config is cfg._config and view._source is not None
+    assert cfg["a3"] == cfg5["a3"] == 3 and view["b1.c1"] == 1
+
+
+def test_as_dict_copy():  # type: ignore
+    cfg = config_from_dict({"a": 1, "b": "{a}"}, interpolate=True)
+    assert cfg["b"] == "1" and cfg.get_int("a") == 1
+    accessor = cfg.accessor("a")
+    assert accessor.get() == 1
+
+    # changing the returned dictionary leaves the configuration untouched
+    d = cfg.as_dict()
+    del d["a"]
+    d["x"] = 9
+    assert "a" in cfg and "x" not in cfg
+    with raises(KeyError):
+        cfg["x"]
+    assert cfg["a"] == 1 and cfg["b"] == "1"
+    assert cfg.get_int("a") == 1 and accessor.get() == 1
+    assert cfg.as_dict() == {"a": 1, "b": "{a}"}
+
+    # views keep sharing the storage, and their values are copied
+    cfg = config_from_dict({"x.l": [1], "x.y": 2})
+    view = cfg.x
+    d = view.as_dict()
+    assert d == {"l": [1], "y": 2}
+    assert view._source is not None
+    d["l"].append(2)
+    assert cfg["x.l"] == [1] and view.as_dict() == {"l": [1], "y": 2}
+    assert view.copy().as_dict() == {"l": [1], "y": 2}
+    assert view._source is not None
+
+
 def test_pop():  # type: ignore
     cfg = config_from_dict(DICT, lowercase_keys=True)
     assert len(cfg) == 2
@@ -349,6 +422,13 @@ def test_configset_copy():  # type: ignore
     cfg2 = cfg.copy()
     assert cfg == cfg2
 
+    # the copy has copies of the underlying configurations
+    cfg2["a1.b1.c1"] = 10
+    del cfg2["a2"]
+    assert cfg["a1.b1.c1"] == 1 and "a2" in cfg
+    assert cfg2["a1.b1.c1"] == 10 and "a2" not in cfg2
+    assert all(a is not b for a, b in zip(cfg.configs, cfg2.configs))
+
 
 def test_configset_pop():  # type: ignore
     cfg = ConfigurationSet(
@@ -81,3 +81,18 @@ def test_reload_2():  # type: ignore
     assert cfg == config_from_dict(
         {PREFIX.lower() + "." + k: str(v) for k, v in d.items()},
     )
+
+
+def test_reload_typed_values():  # type: ignore
+    os.environ["PYCFGTYPED__N"] = "1"
+    os.environ["PYCFGTYPED__FLAG"] = "yes"
+    try:
+        cfg = config_from_env("PYCFGTYPED", lowercase_keys=True)
+        assert cfg.get_int("n") == 1 and cfg.get_bool("flag") is True
+
+        os.environ["PYCFGTYPED__N"] = "2"
+        assert cfg.get_int("n") == 1
+        cfg.reload()
+        assert cfg.get_int("n") == 2 and cfg.get_bool("flag") is True
+    finally:
+        del os.environ["PYCFGTYPED__N"], os.environ["PYCFGTYPED__FLAG"]
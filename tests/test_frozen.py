@@ -0,0 +1,140 @@
+"""Tests for frozen configurations."""
+
+# ruff: noqa: D103,E501
+
+import functools
+from threading import Thread
+
+from pytest import raises
+
+from config import FrozenConfiguration, config, config_from_dict
+from config.helpers import PersistentMap
+
+DICT = {
+    "a1.b1.c1": 1,
+    "a1.b1.c2": [1, 2],
+    "a1.b2.c1": "a",
+    "a2.b1.c1": {"d": 3},
+    "a2.b2.c1": "{a1.b2.c1}-x",
+}
+
+
+def test_persistent_map():  # type: ignore
+    m1 = PersistentMap({"a": 1, "b": 2})
+    m2 = m1.set("c", 3).set("a", 10)
+    m3 = m2.delete("b")
+    assert dict(m1) == {"a": 1, "b": 2}
+    assert dict(m2) == {"a": 10, "b": 2, "c": 3}
+    assert list(m3) == ["a", "c"]
+    assert len(m3) == 2
+    assert "b" not in m3 and [] not in m3
+    assert m1.update({"b": 2}) == m1
+    assert m1.set("a", m1["a"]) is m1
+    with raises(KeyError):
+        m3.delete("b")
+
+    # unchanged keys are shared between versions
+    big = PersistentMap(("k%d" % i, i) for i in range(1000))
+    other = big.set("k0", -1)
+    assert big["k0"] == 0 and other["k0"] == -1
+    assert (
+        sum(e is f for e, f in zip(big._root.entries, other._root.entries))
+        == len(big._root.entries) - 1
+    )
+
+
+def test_frozen():  # type: ignore
+    cfg = FrozenConfiguration(DICT)
+    assert cfg["a1.b1.c1"] == 1
+    assert cfg.a1.b1.c2 == [1, 2]
+    assert cfg["a2.b1"].as_dict() == {"c1.d": 3}
+    assert list(cfg) == list(config_from_dict(DICT))
+    assert cfg == config_from_dict(DICT)
+    assert cfg.thaw() == cfg
+
+    for op in (
+        lambda: cfg.__setitem__("a1", 1),
+        lambda: cfg.__delitem__("a1"),
+        lambda: cfg.setdefault("x", 1),
+        lambda: cfg.pop("a1"),
+        cfg.clear,
+    ):
+        with raises(TypeError):
+            op()
+    assert cfg == config_from_dict(DICT)
+    assert cfg.copy() is cfg
+
+
+def test_frozen_versions():  # type: ignore
+    cfg = config_from_dict(DICT, lowercase_keys=True).freeze()
+    new = cfg.set("A1.B1.C1", 2)
+    newer = new.update({"a3": {"b": 1}})
+    assert cfg["a1.b1.c1"] == 1
+    assert new["a1.b1.c1"] == 2
+    assert newer["a3.b"] == 1 and "a3" not in new
+    assert list(newer) == list(cfg) + ["a3"]
+    assert newer.set("a1.b1.c1", 1).update({"a3.b": 1}) != cfg
+
+
+def test_frozen_versions_lookup():  # type: ignore
+    cfg = FrozenConfiguration({"s%d.k%d" % (i // 10, i): i for i in range(100)})
+    assert cfg["s1.k15"] == 15
+    new = cfg.set("s1.k15", -1).set("s2.x", 1)
+    assert new["s1.k15"] == -1 and new["s2"]["x"] == 1 and "s2.x" in new
+    assert cfg["s1.k15"] == 15 and "s2.x" not in cfg
+    # lookups read the map, and the index of the new version is derived from
+    # the one of the previous version
+    assert cfg._flat is None and new._flat is None
+    old_index, new_index = cfg._contents.index, new._contents.index
+    assert new_index is not None and len(new_index) == 101
+    assert old_index.root.children["s5"] is new_index.root.children["s5"]
+    assert new.as_dict() == {**cfg.as_dict(), "s1.k15": -1, "s2.x": 1}
+
+
+def test_frozen_hash():  # type: ignore
+    cfg = FrozenConfiguration(DICT)
+    assert hash(cfg) == hash(FrozenConfiguration(DICT))
+    new = cfg.set("a1.b1.c1", 2)
+    assert hash(new) != hash(cfg)
+    assert hash(new.set("a1.b1.c1", 1)) == hash(cfg)
+    assert new.set("a1.b1.c1", 1) == cfg
+    assert len({cfg, FrozenConfiguration(DICT), new}) == 2
+
+    calls = []
+
+    @functools.lru_cache(maxsize=None)
+    def build(c):  # type: ignore
+        calls.append(c)
+        return c["a1.b1.c1"]
+
+    assert build(cfg) == build(FrozenConfiguration(DICT)) == 1
+    assert len(calls) == 1
+
+
+def test_frozen_interpolation():  # type: ignore
+    cfg = FrozenConfiguration({**DICT, "a3": "{a4}-x", "a4": "a"}, interpolate=True)
+    assert cfg["a3"] == "a-x"
+    assert cfg.set("a4", "b")["a3"] == "b-x"
+    assert cfg["a3"] == "a-x"
+
+
+def test_frozen_threads():  # type: ignore
+    cfg = FrozenConfiguration({"k%d" % i: i for i in range(100)})
+    results = []
+
+    def read():  # type: ignore
+        results.append(sum(cfg["k%d" % i] for i in range(100)) + len(cfg))
+
+    threads = [Thread(target=read) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [5050] * 8
+
+
+def test_freeze_set():  # type: ignore
+    cfg = config(DICT, {"a1.b1.c1": 5, "a4": 1}).freeze()
+    assert isinstance(cfg, FrozenConfiguration)
+    assert cfg["a1.b1.c1"] == 1
+    assert cfg["a4"] == 1
@@ -64,6 +64,26 @@ def test_raise_on_interpolation_cycle():  # type: ignore
         assert cfg["var1"]
 
 
+def test_interpolation_shared_reference():  # type: ignore
+    # several paths to the same variable are not a cycle, on reads and on resolve
+    diamond = {"x": "{a}{b}", "a": "{c}", "b": "{c}/{d}", "c": "1", "d": "{c}"}
+    for cfg in (
+        config_from_dict(diamond, interpolate=True),
+        config(diamond, {"c": "2"}, interpolate=True),
+        config(
+            {"x": "{a}{b}"}, {"a": "{c}", "b": "{c}/{d}"}, diamond, interpolate=True
+        ),
+    ):
+        assert cfg["x"] == "11/1"
+        assert cfg.resolve()["x"] == "11/1"
+
+    cfg = config({"x": "{a}{b}", "b": "{x}"}, diamond, interpolate=True)
+    with raises(ValueError, match="Cycle detected"):
+        cfg["x"]
+    with raises(ValueError, match="Cycle detected"):
+        cfg.resolve()
+
+
 def test_multiple_interpolation():  # type: ignore
     cfg = config_from_dict(MULTI, lowercase_keys=True, interpolate=True)
 
@@ -275,3 +295,207 @@ def test_interpolation_same_variable_4():  # type: ignore
     )
     assert cfg.var2 == "test/a/b"  # var2(2) --> var1(2) --> var1(1) --> var2(1)
     assert cfg.var1 == "test/a"  # var1(2) --> var1(1) --> var2(1)
+
+
+def test_interpolation_cache():  # type: ignore
+    cfg = config_from_dict(
+        {**VALUES, "other": "{var3}!"},
+        interpolate={"extra": "x"},
+    )
+    assert cfg["var1"] == "This is a test"
+    assert cfg["other"] == "test!"
+    assert set(cfg._interpolated) == {"var1", "other"}
+    # the interpolation variables are not added to the configuration
+    assert "extra" not in cfg.as_dict()
+
+    # unrelated changes keep the cached values
+    cfg["unrelated"] = 1
+    assert set(cfg._interpolated) == {"var1", "other"}
+
+    # changes to a dependency only drop the values depending on it
+    cfg["var2"] = "was a {var3}"
+    assert set(cfg._interpolated) == {"other"}
+    assert cfg["var1"] == "This was a test"
+
+    cfg["var3"] = "change"
+    assert cfg._interpolated == {}
+    assert cfg["var1"] == "This was a change"
+    assert cfg["other"] == "change!"
+
+    del cfg["var3"]
+    with raises(KeyError, match="var3"):
+        assert cfg["var1"]
+
+    # cached lists are not shared with the caller
+    cfg = config_from_dict(ARRAY, interpolate=True)
+    cfg["var4"].append(2)
+    assert cfg["var4"] == ["test", ["repeat test"], 1]
+
+
+def test_interpolation_cache_writes():  # type: ignore
+    cfg = config_from_dict({"a": "1", "b": "{a}"}, interpolate=True)
+    assert cfg["b"] == "1"
+
+    # the dictionary returned by `as_dict` is not the storage
+    cfg.as_dict()["a"] = "2"
+    assert cfg["b"] == "1"
+
+    # every write to the configuration drops the values depending on it
+    cfg["a"] = "2"
+    assert cfg["b"] == "2"
+    cfg.update({"a": "3"})
+    assert cfg["b"] == "3"
+    cfg.pop("a")
+    cfg.setdefault("a", "4")
+    assert cfg["b"] == "4"
+    del cfg["a"]
+    cfg["a"] = "5"
+    assert cfg["b"] == "5"
+    cfg._config = {"a": "6", "b": "{a}"}
+    assert cfg["b"] == "6"
+    cfg.compact()
+    cfg["a"] = "7"
+    assert cfg["b"] == "7"
+    cfg.clear()
+    cfg["b"] = "{a}"
+    with raises(KeyError, match="a"):
+        cfg["b"]
+
+
+def test_interpolation_cache_reload():  # type: ignore
+    import os
+
+    from config import config_from_env
+
+    os.environ["PYCFGTEST__VAR1"] = "{var2}/{var3}"
+    os.environ["PYCFGTEST__VAR2"] = "a"
+    os.environ["PYCFGTEST__VAR3"] = "b"
+    try:
+        cfg = config_from_env("PYCFGTEST", lowercase_keys=True, interpolate=True)
+        assert cfg.var1 == "a/b"
+        assert cfg.var3 == "b"
+
+        os.environ["PYCFGTEST__VAR2"] = "c"
+        cfg.reload()
+        assert set(cfg._interpolated) == {"var3"}
+        assert cfg.var1 == "c/b"
+    finally:
+        for var in ("VAR1", "VAR2", "VAR3"):
+            del os.environ["PYCFGTEST__" + var]
+
+
+def test_parsed_templates():  # type: ignore
+    from config.helpers import parse_template
+
+    template = parse_template("{b!r} and {a:>4} {{literal}} {c}")
+    assert template is parse_template("{b!r} and {a:>4} {{literal}} {c}")
+    assert template.variables == ("a", "b", "c")
+    assert template.direct
+    assert template.render({"a": 1, "b": "x", "c": 2.5}) == "'x' and    1 {literal} 2.5"
+
+    # nested replacement fields in format specs fall back to str.format
+    template = parse_template("{a:{width}}")
+    assert not template.direct
+    assert template.render({"a": 1, "width": 3}) == "  1"
+
+    # flattened keys are read whole, and attribute and index access keep their
+    # str.format meaning otherwise
+    template = parse_template("{c[0]} {d.real}")
+    assert template.direct
+    assert template.render({"c": [2.5], "d": 1}) == "2.5 1"
+    assert template.render({"c[0]": 2.5, "d.real": 1}) == "2.5 1"
+    with raises(KeyError, match="'c'"):
+        template.render({"d": 1})
+    for method in InterpolateEnumType:
+        cfg = config_from_dict(
+            {"A": "{a.b}/{c[1]}:{d.real:>3}", "a.b": "x", "c": [1, 2], "d": 4},
+            interpolate=True,
+            interpolate_type=method,
+        )
+        assert cfg["A"] == "x/2:  4"
+        assert cfg.resolve()["A"] == "x/2:  4"
+        cfg = config_from_dict(
+            {"A": "{a.b}", "a.c": "x"},
+            interpolate=True,
+            interpolate_type=method,
+        )
+        with raises(KeyError, match="'a'"):
+            cfg["A"]
+    for method in InterpolateEnumType:
+        dotted = config(
+            {"A": "{b}-{a.b}", "a.b": "x"},
+            {"b": "{a.b}", "a.b": "y"},
+            interpolate=True,
+            interpolate_type=method,
+        )
+        plain = config(
+            {"A": "{b}-{a}", "a": "x"},
+            {"b": "{a}", "a": "y"},
+            interpolate=True,
+            interpolate_type=method,
+        )
+        assert dotted["A"] == plain["A"]
+
+    cfg = config_from_dict(
+        {"a": 1, "b": "{a!s:>3}", "c": "{b}{{x}}"},
+        interpolate=True,
+    )
+    assert cfg.c == "  1{x}"
+
+
+def test_resolve():  # type: ignore
+    for values, methods in (
+        (VALUES, list(InterpolateEnumType)),
+        (VALUES_FMT, list(InterpolateEnumType)),
+        (MULTI, [InterpolateEnumType.STANDARD]),
+        (ARRAY, [InterpolateEnumType.STANDARD]),
+    ):
+        for method in methods:
+            cfg = config_from_dict(values, interpolate=True, interpolate_type=method)
+            resolved = cfg.resolve()
+            assert resolved._interpolate is False
+            assert resolved.as_dict() == {k: cfg[k] for k in values}
+
+    cfg = config_from_dict(FAILS, interpolate=True)
+    with raises(ValueError, match="Cycle detected"):
+        cfg.resolve()
+
+    cfg = config_from_dict({"a": "{missing}"}, interpolate=True)
+    with raises(KeyError, match="missing"):
+        cfg.resolve()
+
+    # shared references are resolved once, and long chains do not recurse
+    values = {"a": "{x}", "b": "{x}/2", "c": "{a}-{b}", "x": "1"}
+    values.update({f"v{i}": "{v%d}." % (i + 1) for i in range(5000)})
+    values["v5000"] = "end"
+    cfg = config_from_dict(values, interpolate=True)
+    resolved = cfg.resolve()
+    assert resolved["c"] == "1-1/2"
+    assert resolved["v0"] == "end" + "." * 5000
+
+    cfg = config_from_dict(VALUES)
+    assert cfg.resolve() == cfg
+
+
+def test_resolve_on_set():  # type: ignore
+    values_1 = {"var1": "something", "var2": "test"}
+    values_2 = {"var1": "{var2}/a", "var2": "{var1}/b", "var3": "{var1}"}
+
+    for method in InterpolateEnumType:
+        cfg = config(values_2, values_1, interpolate=True, interpolate_type=method)
+        if method == InterpolateEnumType.STANDARD:
+            with raises(ValueError, match="Cycle detected"):
+                cfg.resolve()
+            continue
+        assert cfg.resolve().as_dict() == {
+            "var1": cfg.var1,
+            "var2": cfg.var2,
+            "var3": cfg.var3,
+        }
+
+    cfg = config(SET1, SET2, interpolate={"var3": "overridden"})
+    assert cfg.resolve().as_dict() == {
+        "var1": "This is a overridden",
+        "var2": "is a overridden",
+        "var3": "test",
+    }
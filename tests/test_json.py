@@ -6,7 +6,13 @@ import json
 import tempfile
 from pathlib import Path
 
-from config import config_from_dict, config_from_json
+from config import (
+    Configuration,
+    ConfigurationSet,
+    FileConfiguration,
+    config_from_dict,
+    config_from_json,
+)
 
 DICT = {
     "a1.b1.c1": 1,
@@ -83,3 +89,262 @@ def test_reload_json():  # type: ignore
         f.file.flush()
         cfg.reload()
         assert cfg == config_from_dict({"test": 1})
+
+
+def test_reload_json_accessor():  # type: ignore
+    with tempfile.NamedTemporaryFile() as f:
+        f.file.write(JSON.encode())
+        f.file.flush()
+        cfg = config_from_json(f.name, read_from_file=True)
+        value = cfg.accessor("a1.b1.c1", type=str)
+        assert value() == "1"
+
+        f.file.seek(0)
+        f.file.truncate(0)
+        f.file.write(b'{"a1": {"b1": {"c1": 2}}}')
+        f.file.flush()
+        cfg.reload()
+        assert value() == "2"
+
+
+def test_reload_json_copy():  # type: ignore
+    with tempfile.NamedTemporaryFile() as f:
+        f.file.write(JSON.encode())
+        f.file.flush()
+        cfg = config_from_json(f.name, read_from_file=True)
+        cfg2 = cfg.copy()
+        assert type(cfg2) is Configuration
+
+        f.file.seek(0)
+        f.file.truncate(0)
+        f.file.write(b'{"a1": {"b1": {"c1": 2}}}')
+        f.file.flush()
+        cfg.reload()
+        assert cfg["a1.b1.c1"] == 2
+        assert cfg2["a1.b1.c1"] == 1
+        cfg2["a1.b1.c1"] = 3
+        assert cfg["a1.b1.c1"] == 2
+
+
+def test_reload_json_set_copy():  # type: ignore
+    with tempfile.NamedTemporaryFile() as f:
+        f.file.write(JSON.encode())
+        f.file.flush()
+        cfg = ConfigurationSet(
+            config_from_json(f.name, read_from_file=True),
+            config_from_dict({"a3": 1}),
+        )
+        cfg2 = cfg.copy()
+        assert [type(c) for c in cfg2.configs] == [type(c) for c in cfg.configs]
+        assert all(a is not b for a, b in zip(cfg.configs, cfg2.configs))
+
+        f.file.seek(0)
+        f.file.truncate(0)
+        f.file.write(b'{"a1": {"b1": {"c1": 2}}}')
+        f.file.flush()
+        cfg2.reload()
+        assert cfg2["a1.b1.c1"] == 2 and cfg2["a3"] == 1
+        assert cfg["a1.b1.c1"] == 1
+
+        # writes to either side are not visible to the other
+        cfg["a1.b1.c2"] = 5
+        cfg2.configs[1]["a3"] = 2
+        assert "a1.b1.c2" not in cfg2 and cfg["a3"] == 1
+        cfg.reload()
+        assert cfg["a1.b1.c1"] == 2 and cfg2["a1.b1.c1"] == 2
+
+
+def test_reload_json_snapshot():  # type: ignore
+    from threading import Thread
+
+    with tempfile.NamedTemporaryFile() as f:
+        f.file.write(b'{"a": 0, "b": 0, "c": "{a}"}')
+        f.file.flush()
+        cfg = config_from_json(f.name, read_from_file=True, interpolate=True)
+        assert cfg["c"] == "0"
+        old = cfg.as_dict()
+
+        errors = []
+        done = False
+
+        def read():  # type: ignore
+            while not done:
+                d = cfg.as_dict()
+                if d["a"] != d["b"] or len(cfg) != 3:
+                    errors.append(d)
+
+        threads = [Thread(target=read) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for i in range(1, 50):
+            f.file.seek(0)
+            f.file.truncate(0)
+            f.file.write(json.dumps({"a": i, "b": i, "c": "{a}"}).encode())
+            f.file.flush()
+            cfg.reload()
+        done = True
+        for t in threads:
+            t.join()
+        assert not errors
+
+        # the published state is consistent and the previous one untouched
+        assert cfg["c"] == "49"
+        assert old == {"a": 0, "b": 0, "c": "{a}"}
+        cached = cfg._interpolated
+        f.file.seek(0)
+        f.file.write(b'{"a": 49, "b": 49, "c": "{a}", "d": 1}')
+        f.file.flush()
+        assert cfg.reload()
+        assert cfg._interpolated is not cached and cached == {"c": "49"}
+
+
+def test_reload_stale_interpolation():  # type: ignore
+    cfg = config_from_dict({"a": "1", "c": "{a}"}, interpolate=True)
+    old = cfg._config
+    cfg._replace_config({"a": "2", "c": "{a}"})
+    # a reader that got the raw value before the reload does not cache its
+    # result in the new contents
+    assert cfg._interpolate_value("c", "{a}", old) == "1"
+    assert cfg["c"] == "2"
+    assert cfg._interpolated == {"c": "2"}
+
+
+def test_reload_unchanged(tmp_path, mocker):  # type: ignore
+    import os
+
+    from config import ConfigurationSet, JSONConfiguration
+
+    path = tmp_path / "config.json"
+    path.write_text(JSON)
+    os.utime(path, ns=(10**18, 10**18))
+    parse = mocker.spy(JSONConfiguration, "_parse")
+    cfg = config_from_json(path, read_from_file=True)
+    generation = cfg._generation
+
+    # files that were not modified are not read again
+    assert cfg.reload() is False
+    assert parse.call_count == 1
+
+    # modified files with the same contents are read but not published
+    path.write_text(JSON)
+    os.utime(path, ns=(10**18 + 1, 10**18 + 1))
+    assert cfg.reload() is False
+    assert parse.call_count == 2 and cfg._generation == generation
+    assert cfg.reload() is False
+    assert parse.call_count == 2
+
+    cfgs = ConfigurationSet(cfg, config_from_dict({"x": 1}))
+    assert cfgs.reload() is False
+    assert cfgs.reload(parallel=True) is False
+    path.write_text('{"a": 1}')
+    assert cfgs.reload(parallel=True) is True
+    assert cfgs["a"] == 1 and cfg._generation != generation
+
+    # recently modified files are always read again
+    assert cfg.reload() is False
+    assert parse.call_count == 4
+
+
+def test_json_cache(tmp_path, mocker):  # type: ignore
+    import os
+
+    from config import JSONConfiguration
+
+    path = tmp_path / "config.json"
+    path.write_text(JSON)
+    cache = tmp_path / "cache"
+    parse = mocker.spy(JSONConfiguration, "_parse")
+
+    cfg = config_from_json(path, read_from_file=True, cache_dir=cache)
+    assert cfg == config_from_dict(DICT)
+    assert parse.call_count == 1
+    assert len(os.listdir(cache)) == 1
+
+    # unchanged files are read from the cache
+    cfg = config_from_json(str(path), read_from_file=True, cache_dir=cache)
+    assert cfg == config_from_dict(DICT)
+    assert parse.call_count == 1
+    # and so are files with the same contents
+    os.utime(path, ns=(0, 0))
+    assert config_from_json(path, read_from_file=True, cache_dir=cache) == cfg
+    assert parse.call_count == 1
+
+    # other settings have their own entries
+    config_from_json(path, read_from_file=True, lowercase_keys=True, cache_dir=cache)
+    assert parse.call_count == 2
+    assert len(os.listdir(cache)) == 2
+
+    path.write_text('{"a": {"b": 1}}')
+    cfg.reload()
+    assert cfg == config_from_dict({"a.b": 1})
+    assert parse.call_count == 3
+
+    # broken entries are replaced
+    for name in os.listdir(cache):
+        (cache / name).write_bytes(b"broken")
+    assert config_from_json(path, read_from_file=True, cache_dir=cache) == cfg
+    assert parse.call_count == 4
+    assert config_from_json(path, read_from_file=True, cache_dir=cache) == cfg
+    assert parse.call_count == 4
+
+
+def test_json_cache_racy(tmp_path, mocker):  # type: ignore
+    import os
+    import time
+
+    from config import JSONConfiguration
+
+    path = tmp_path / "config.json"
+    path.write_text('{"a": 1}')
+    mtime = os.stat(path).st_mtime_ns
+    cache = tmp_path / "cache"
+    parse = mocker.spy(JSONConfiguration, "_parse")
+    assert config_from_json(path, read_from_file=True, cache_dir=cache)["a"] == 1
+
+    # files changed within the granularity of their modification time
+    path.write_text('{"a": 2}')
+    os.utime(path, ns=(mtime, mtime))
+    assert config_from_json(path, read_from_file=True, cache_dir=cache)["a"] == 2
+    path.write_text('{"a": 3}')
+    os.utime(path, ns=(mtime, mtime))
+    mocker.patch("config.time.time_ns", return_value=time.time_ns() + 10**10)
+    assert config_from_json(path, read_from_file=True, cache_dir=cache)["a"] == 3
+    assert parse.call_count == 3
+
+    # once their modification time can be trusted, they are not read again
+    assert config_from_json(path, read_from_file=True, cache_dir=cache)["a"] == 3
+    assert parse.call_count == 3
+
+
+def test_reload_legacy_subclass(tmp_path):  # type: ignore
+    class LegacyJSON(FileConfiguration):
+        # subclasses written for earlier versions only override `_reload`
+        def _reload(self, data, read_from_file=False):  # type: ignore
+            if read_from_file:
+                with open(data) as f:
+                    data = f.read()
+            self._config = self._flatten_dict(json.loads(data))
+
+    path = tmp_path / "config.json"
+    path.write_text('{"a": {"b": 1}}')
+    cfg = LegacyJSON(str(path), read_from_file=True)
+    assert cfg["a.b"] == 1
+    assert LegacyJSON('{"c": 2}')["c"] == 2
+
+    path.write_text('{"a": {"b": 2}}')
+    assert cfg.reload() is True
+    assert cfg["a.b"] == 2
+    assert cfg.reload() is False
+
+    cfgs = ConfigurationSet(cfg, config_from_dict({"d": 1}))
+    path.write_text('{"a": {"b": 3}}')
+    assert cfgs.reload(parallel=True) is True
+    assert cfgs["a.b"] == 3
+    assert cfgs["a"].as_dict() == {"b": 3}
+
+    missing = LegacyJSON(
+        str(tmp_path / "missing.json"),
+        True,
+        ignore_missing_paths=True,
+    )
+    assert missing.as_dict() == {}
@@ -0,0 +1,245 @@
+"""Tests for the watcher of configuration files."""
+
+# ruff: noqa: D103,E501
+
+import gc
+import json
+import os
+import sys
+
+import pytest
+
+from config import (
+    ConfigurationSet,
+    Watcher,
+    config_from_dict,
+    config_from_json,
+    config_from_path,
+)
+
+BACKENDS = ["poll"] + (["inotify"] if sys.platform.startswith("linux") else [])
+
+
+def write(path, text, mtime):  # type: ignore
+    """Write a file with an old modification time, so that its signature is trusted."""
+    path.write_text(text)
+    os.utime(path, ns=(mtime * 10**9, mtime * 10**9))
+
+
+def run(watcher, waits=10):  # type: ignore
+    """Run the loop of the watcher in the current thread, for a number of waits."""
+    wait = watcher._backend.wait
+
+    def limited(timeout):  # type: ignore
+        nonlocal waits
+        waits -= 1
+        return wait(timeout) if waits >= 0 else None
+
+    watcher._backend.wait = limited
+    watcher._run()
+    watcher._backend.wait = wait
+
+
+class FakeBackend:
+    """Report changes to the targets at given times of a fake clock."""
+
+    def __init__(self, events):  # type: ignore  # noqa: D107
+        self.now = 0.0
+        self.events = list(events)
+
+    def sync(self):  # type: ignore  # noqa: D102
+        return set()
+
+    def wait(self, timeout):  # type: ignore  # noqa: D102
+        if not self.events:
+            return None
+        at, changed = self.events[0]
+        if at > self.now + timeout:
+            self.now += timeout
+            return set()
+        self.events.pop(0)
+        self.now = max(self.now, at)
+        return changed
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watch_file(tmp_path, backend):  # type: ignore
+    path = tmp_path / "config.json"
+    write(path, '{"a": 1}', 1)
+    cfg = config_from_json(path, read_from_file=True)
+    changes = []
+
+    watcher = Watcher(
+        cfg,
+        backend=backend,
+        debounce=0,
+        poll_interval=0,
+        on_change=changes.append,
+    )
+    assert watcher.backend == backend
+    watcher._backend.sync()
+
+    # a burst of writes results in a single reload
+    for i in range(2, 6):
+        write(path, json.dumps({"a": i}), i)
+    run(watcher)
+    assert cfg["a"] == 5
+    assert changes == [cfg]
+
+    # files replaced by a rename, as editors do
+    tmp = tmp_path / "config.json.tmp"
+    write(tmp, '{"a": 6}', 6)
+    os.replace(tmp, path)
+    run(watcher)
+    assert cfg["a"] == 6
+    assert changes == [cfg, cfg]
+    watcher.stop()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watch_symlink_swap(tmp_path, backend):  # type: ignore
+    # the layout of a Kubernetes volume mounted from a ConfigMap
+    mount = tmp_path / "mount"
+    mount.mkdir()
+    (mount / "..v1").mkdir()
+    write(mount / "..v1" / "a", "1", 1)
+    (mount / "..data").symlink_to("..v1")
+    (mount / "a").symlink_to("..data/a")
+    cfg = config_from_path(str(mount), remove_level=0)
+    other = config_from_dict({"b": 1})
+    cfgs = ConfigurationSet(cfg, other)
+    assert cfgs["a"] == "1"
+    changes = []
+
+    watcher = Watcher(
+        cfgs,
+        backend=backend,
+        debounce=0,
+        poll_interval=0,
+        on_change=changes.append,
+    )
+    watcher._backend.sync()
+    (mount / "..v2").mkdir()
+    write(mount / "..v2" / "a", "2", 2)
+    (mount / "..data_tmp").symlink_to("..v2")
+    os.replace(mount / "..data_tmp", mount / "..data")
+    run(watcher)
+    assert cfgs["a"] == "2"
+    assert changes == [cfg]
+    watcher.stop()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watch_missing_directory(tmp_path, backend):  # type: ignore
+    path = tmp_path / "conf" / "config.json"
+    cfg = config_from_json(path, read_from_file=True, ignore_missing_paths=True)
+    assert cfg.as_dict() == {}
+    changes = []
+
+    watcher = Watcher(
+        cfg,
+        backend=backend,
+        debounce=0,
+        poll_interval=0,
+        on_change=changes.append,
+    )
+    watcher._backend.sync()
+    path.parent.mkdir()
+    write(path, '{"a": 1}', 1)
+    run(watcher)
+    assert cfg["a"] == 1
+    assert changes == [cfg]
+    watcher.stop()
+
+
+def test_watch_errors(tmp_path, caplog):  # type: ignore
+    paths = [tmp_path / "a.json", tmp_path / "b.json"]
+    for path in paths:
+        write(path, '{"a": 1}', 1)
+    cfgs = [config_from_json(path, read_from_file=True) for path in paths]
+    errors = []
+
+    def on_error(cfg, err):  # type: ignore
+        errors.append((cfg, err))
+        raise RuntimeError("on_error")
+
+    def on_change(cfg):  # type: ignore
+        raise RuntimeError("on_change")
+
+    watcher = Watcher(*cfgs, backend="poll", on_change=on_change, on_error=on_error)
+
+    # configurations failing to reload keep their contents
+    write(paths[0], "{", 2)
+    write(paths[1], '{"a": 2}', 2)
+    assert watcher._reload({0, 1}) == set()
+    assert errors[0][0] is cfgs[0] and isinstance(errors[0][1], ValueError)
+    assert cfgs[0]["a"] == 1
+    # and errors of the callbacks do not stop the other reloads
+    assert cfgs[1]["a"] == 2
+    assert [
+        r.getMessage().startswith("Exception in watcher callback")
+        for r in caplog.records
+    ] == [True, True]
+    assert [type(r.exc_info[1]) for r in caplog.records] == [RuntimeError, RuntimeError]
+
+    write(paths[0], '{"a": 3}', 3)
+    watcher._reload({0})
+    assert cfgs[0]["a"] == 3
+    watcher.stop()
+
+
+def test_watch_debounce(mocker):  # type: ignore
+    watcher = Watcher(config_from_dict({}), backend="poll", debounce=1, poll_interval=5)
+    backend = FakeBackend(
+        [(0, {0}), (0.5, {0}), (1.0, {1})]  # a burst
+        + [(10 + i / 2, {0}) for i in range(40)]  # changes that never settle
+        + [(60, set())],
+    )
+    watcher._backend = backend
+    mocker.patch("config.watch.time.monotonic", lambda: backend.now)
+    reloads = []
+    mocker.patch.object(
+        watcher,
+        "_reload",
+        lambda pending: reloads.append((backend.now, sorted(pending))) or set(),
+    )
+
+    watcher._run()
+    # reloaded once no further changes happened for `debounce` seconds
+    assert reloads[0] == (2.0, [0, 1])
+    # or after at most 10 debounce periods
+    assert reloads[1] == (20.0, [0])
+    assert reloads[2:] == [(30.5, [0])]
+
+
+def test_watch_thread(tmp_path):  # type: ignore
+    cfg = config_from_json(
+        tmp_path / "config.json",
+        read_from_file=True,
+        ignore_missing_paths=True,
+    )
+    with Watcher(cfg, poll_interval=60) as watcher:
+        assert watcher._thread is not None and watcher._thread.is_alive()
+    assert not watcher._thread.is_alive()
+
+    with pytest.raises(RuntimeError):
+        watcher.start()
+    watcher.stop()
+
+
+def test_watch_backend():  # type: ignore
+    with pytest.raises(ValueError):
+        Watcher(backend="other")
+    watcher = Watcher(config_from_dict({}), backend="poll")
+    assert watcher.backend == "poll"
+    watcher.stop()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify")
+def test_watch_release_unstopped():  # type: ignore
+    watcher = Watcher(config_from_dict({}), backend="inotify")
+    finalizer = watcher._backend._finalizer
+    assert finalizer.alive
+    del watcher
+    gc.collect()
+    assert not finalizer.alive